@@ -159,6 +159,9 @@ def main():
         # Get a sample from validation set
         sample_image, sample_label = val_dataset[0]
 
+        # Warm up first so the timing below reflects steady-state latency
+        engine.warmup(sample_image)
+
         print("Running inference on sample image...")
         result = engine.infer(sample_image, benchmark=True)
 
@@ -423,17 +423,25 @@ class DigitalTwinTester:
         }
         
         total_time = 0
-        for i, cmd in enumerate(commands):
+        joint_targets = []
+        for cmd in commands:
             # Check timing
             cmd_time = cmd.get("duration_ms", 16.67)  # Default 60Hz
             total_time += cmd_time
             
-            # Validate joint limits
             if "joint_targets" in cmd:
-                for j, target in enumerate(cmd["joint_targets"]):
-                    if target < -3.14 or target > 3.14:  # Rough limits
-                        result["safety_valid"] = False
-                        result["errors"].append(f"Joint {j} target {target:.3f} out of range")
+                # Always float: pad_sequence copies every row into the first row's dtype,
+                # so an integer home pose first would truncate later targets (3.9 -> 3)
+                joint_targets.append(torch.as_tensor(cmd["joint_targets"], dtype=torch.float32).flatten())
+        
+        # Validate joint limits for the whole sequence at once ([K, J], zero-padded)
+        if joint_targets:
+            targets = torch.nn.utils.rnn.pad_sequence(joint_targets, batch_first=True)
+            bad_mask = targets.abs() > 3.14  # Rough limits
+            if bad_mask.any():
+                result["safety_valid"] = False
+                for k, j in bad_mask.nonzero().tolist():
+                    result["errors"].append(f"Joint {j} target {targets[k, j].item():.3f} out of range")
         
         result["actual_duration_ms"] = total_time
         
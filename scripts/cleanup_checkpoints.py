@@ -43,6 +43,16 @@ CHECKPOINT_PATTERNS = [
     r".*?(\d{5,})",           # Any 5+ digit number (step counts)
 ]
 
+# Checkpoint file extensions
+CHECKPOINT_EXTENSIONS = ('.pt', '.pth', '.safetensors', '.ckpt', '.bin')
+STEP_EXTENSIONS = ('.pt', '.pth', '.safetensors', '.ckpt')
+
+# Directories that never hold checkpoints - skipped while walking
+SKIP_DIRS = {
+    '.git', 'node_modules', '__pycache__', '.venv', 'venv',
+    '.cache', '.mypy_cache', '.pytest_cache',
+}
+
 
 def get_checkpoint_number(name: str) -> int:
     """Extract checkpoint number from name for sorting."""
@@ -93,29 +103,34 @@ def find_checkpoint_groups(search_path: Path) -> List[Tuple[Path, List[Path]]]:
         return groups
 
     # Find directories containing checkpoint-* subdirs
-    for parent in search_path.rglob("*"):
-        if not parent.is_dir():
+    for dirpath, dirnames, _ in os.walk(search_path):
+        # Prune non-model trees in place so os.walk never descends into them
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+
+        parent = Path(dirpath)
+        if parent == search_path:
             continue
 
         checkpoints = []
 
-        # HuggingFace style: checkpoint-XXXX directories
-        checkpoints.extend(list(parent.glob("checkpoint-*")))
-
-        # Epoch style
-        checkpoints.extend(list(parent.glob("epoch*")))
-        checkpoints.extend(list(parent.glob("epoch_*")))
-
-        # Step style
-        checkpoints.extend([p for p in parent.glob("*step*") if p.is_dir() or p.suffix in ['.pt', '.pth', '.safetensors', '.ckpt']])
-
-        # Direct checkpoint files
-        for ext in ['.pt', '.pth', '.safetensors', '.ckpt', '.bin']:
-            checkpoints.extend(list(parent.glob(f"*{ext}")))
-
-        # Deduplicate and filter
-        checkpoints = list(set(checkpoints))
-        checkpoints = [c for c in checkpoints if c.exists()]
+        # Single directory read; classify each entry by name
+        try:
+            with os.scandir(parent) as it:
+                for entry in it:
+                    name = entry.name
+                    if (
+                        # HuggingFace style: checkpoint-XXXX directories
+                        name.startswith("checkpoint-")
+                        # Epoch style
+                        or name.startswith("epoch")
+                        # Direct checkpoint files
+                        or name.endswith(CHECKPOINT_EXTENSIONS)
+                        # Step style
+                        or ("step" in name and (entry.is_dir() or name.endswith(STEP_EXTENSIONS)))
+                    ):
+                        checkpoints.append(Path(entry.path))
+        except OSError:
+            continue
 
         if len(checkpoints) > 0:
             # Sort by checkpoint number
@@ -4,8 +4,12 @@ Create image assets for MOTHER Robotics Dashboard
 """
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
+import os
 from pathlib import Path
 
+# Set by setup_complete.py, which pre-creates every output directory
+SETUP_INPLACE = bool(os.environ.get('MOTHER_SETUP_INPLACE'))
+
 def create_logo():
     """Create robot logo"""
     print("Creating logo...")
@@ -34,7 +38,8 @@ def create_logo():
 
     # Save
     output_path = Path('public/assets/images/logo.png')
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if not SETUP_INPLACE:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
     img.save(output_path)
     print(f"✓ Created logo: {output_path}")
 
@@ -51,7 +56,8 @@ def create_icon():
 
     # Save
     output_path = Path('public/assets/images/robot-icon.png')
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if not SETUP_INPLACE:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
     img.save(output_path)
     print(f"✓ Created icon: {output_path}")
 
@@ -60,21 +66,27 @@ def create_background():
     print("Creating background...")
 
     # Create futuristic background
-    img = Image.new('RGB', (1920, 1080), color='#0a0a1a')
-    draw = ImageDraw.Draw(img)
+    arr = np.full((1080, 1920, 3), (0x0a, 0x0a, 0x1a), dtype=np.uint8)
 
-    # Draw circuit lines
+    # Draw circuit lines (2px outlines, sliced straight into the pixel buffer)
+    colors = np.array([(0x0d, 0x6e, 0xfd), (0x19, 0x87, 0x54), (0xdc, 0x35, 0x45)], dtype=np.uint8)
     for i in range(20):
         x = np.random.randint(0, 1920)
         y = np.random.randint(0, 1080)
         width = np.random.randint(50, 300)
         height = np.random.randint(50, 300)
-        color = np.random.choice(['#0d6efd22', '#19875422', '#dc354522'])
-        draw.rectangle([x, y, x+width, y+height], outline=color, width=2)
+        color = colors[np.random.randint(0, len(colors))]
+        arr[y:y+2, x:x+width+1] = color
+        arr[y+height-1:y+height+1, x:x+width+1] = color
+        arr[y:y+height+1, x:x+2] = color
+        arr[y:y+height+1, x+width-1:x+width+1] = color
+
+    img = Image.fromarray(arr)
 
     # Save
     output_path = Path('public/assets/images/background.jpg')
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if not SETUP_INPLACE:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
     img.save(output_path)
     print(f"✓ Created background: {output_path}")
 
@@ -2,51 +2,67 @@
 """
 Create sample log files for MOTHER Robotics
 """
+import os
 from datetime import datetime, timedelta
-import random
 from pathlib import Path
 
+import numpy as np
+
+# Set by setup_complete.py, which pre-creates every output directory
+SETUP_INPLACE = bool(os.environ.get('MOTHER_SETUP_INPLACE'))
+
+rng = np.random.default_rng()
+
 def create_ai_training_log():
     """Create sample AI training log"""
     print("Creating AI training log...")
 
     log_file = Path('data/logs/ai_training.log')
-    log_file.parent.mkdir(parents=True, exist_ok=True)
+    if not SETUP_INPLACE:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    # Random training events
+    event_types = [
+        "INFO - Starting training epoch",
+        "INFO - Epoch completed",
+        "INFO - Validation accuracy",
+        "WARNING - Learning rate adjustment",
+        "INFO - Model checkpoint saved",
+        "ERROR - Gradient overflow",
+        "INFO - Training completed"
+    ]
+
+    # Draw all randomness up-front
+    n = 1000
+    event_idx = rng.integers(0, len(event_types), size=n).tolist()
+    accuracies = rng.uniform(0.65, 0.95, size=n).tolist()
+    losses = rng.uniform(0.1, 0.5, size=n).tolist()
+    checkpoints = rng.integers(1, 101, size=n).tolist()
+    durations = rng.uniform(0.5, 3.0, size=n).tolist()
+
+    lines = []
 
     with open(log_file, 'w') as f:
         start_time = datetime.now() - timedelta(days=7)
 
-        for i in range(1000):
+        for i in range(n):
             timestamp = start_time + timedelta(minutes=i*10)
-
-            # Random training events
-            event_types = [
-                "INFO - Starting training epoch",
-                "INFO - Epoch completed",
-                "INFO - Validation accuracy",
-                "WARNING - Learning rate adjustment",
-                "INFO - Model checkpoint saved",
-                "ERROR - Gradient overflow",
-                "INFO - Training completed"
-            ]
-
-            event = random.choice(event_types)
+            event = event_types[event_idx[i]]
 
             # Add metrics for some events
             if "accuracy" in event:
-                accuracy = random.uniform(0.65, 0.95)
-                loss = random.uniform(0.1, 0.5)
-                log_line = f"{timestamp.isoformat()} - {event}: {accuracy:.4f}, loss: {loss:.4f}\n"
+                log_line = f"{timestamp.isoformat()} - {event}: {accuracies[i]:.4f}, loss: {losses[i]:.4f}\n"
             elif "checkpoint" in event:
-                checkpoint = f"checkpoint_epoch_{random.randint(1, 100)}.pth"
+                checkpoint = f"checkpoint_epoch_{checkpoints[i]}.pth"
                 log_line = f"{timestamp.isoformat()} - {event}: {checkpoint}\n"
             elif "completed" in event:
-                duration = random.uniform(0.5, 3.0)
-                log_line = f"{timestamp.isoformat()} - {event} in {duration:.2f} hours\n"
+                log_line = f"{timestamp.isoformat()} - {event} in {durations[i]:.2f} hours\n"
             else:
                 log_line = f"{timestamp.isoformat()} - {event}\n"
 
-            f.write(log_line)
+            lines.append(log_line)
+
+        f.write(''.join(lines))
 
     print(f"✓ Created {log_file}")
 
@@ -55,36 +71,48 @@ def create_hardware_log():
     print("Creating hardware log...")
 
     log_file = Path('data/logs/hardware.log')
-    log_file.parent.mkdir(parents=True, exist_ok=True)
+    if not SETUP_INPLACE:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
 
     components = ["motor_controller", "camera", "lidar", "imu", "battery", "gpio"]
     statuses = ["connected", "disconnected", "error", "warning", "calibrating", "operational"]
+    resolutions = ["640x480", "1280x720", "1920x1080"]
+
+    # Draw all randomness up-front
+    n = 500
+    component_idx = rng.integers(0, len(components), size=n).tolist()
+    status_idx = rng.integers(0, len(statuses), size=n).tolist()
+    speeds = rng.integers(0, 101, size=n).tolist()
+    currents = rng.uniform(0.1, 5.0, size=n).tolist()
+    fps_values = rng.integers(15, 61, size=n).tolist()
+    resolution_idx = rng.integers(0, len(resolutions), size=n).tolist()
+    levels = rng.integers(20, 101, size=n).tolist()
+    voltages = rng.uniform(3.0, 4.2, size=n).tolist()
+
+    lines = []
 
     with open(log_file, 'w') as f:
         start_time = datetime.now() - timedelta(days=1)
 
-        for i in range(500):
+        for i in range(n):
             timestamp = start_time + timedelta(seconds=i*30)
-            component = random.choice(components)
-            status = random.choice(statuses)
+            component = components[component_idx[i]]
+            status = statuses[status_idx[i]]
 
             # Add details based on component
             if component == "motor_controller":
-                speed = random.randint(0, 100)
-                current = random.uniform(0.1, 5.0)
-                log_line = f"{timestamp.isoformat()} - {component}: {status}, speed={speed}%, current={current:.2f}A\n"
+                log_line = f"{timestamp.isoformat()} - {component}: {status}, speed={speeds[i]}%, current={currents[i]:.2f}A\n"
             elif component == "camera":
-                fps = random.randint(15, 60)
-                resolution = random.choice(["640x480", "1280x720", "1920x1080"])
-                log_line = f"{timestamp.isoformat()} - {component}: {status}, fps={fps}, res={resolution}\n"
+                resolution = resolutions[resolution_idx[i]]
+                log_line = f"{timestamp.isoformat()} - {component}: {status}, fps={fps_values[i]}, res={resolution}\n"
             elif component == "battery":
-                level = random.randint(20, 100)
-                voltage = random.uniform(3.0, 4.2)
-                log_line = f"{timestamp.isoformat()} - {component}: {status}, level={level}%, voltage={voltage:.2f}V\n"
+                log_line = f"{timestamp.isoformat()} - {component}: {status}, level={levels[i]}%, voltage={voltages[i]:.2f}V\n"
             else:
                 log_line = f"{timestamp.isoformat()} - {component}: {status}\n"
 
-            f.write(log_line)
+            lines.append(log_line)
+
+        f.write(''.join(lines))
 
     print(f"✓ Created {log_file}")
 
@@ -93,7 +121,8 @@ def create_dashboard_log():
     print("Creating dashboard log...")
 
     log_file = Path('data/logs/dashboard.log')
-    log_file.parent.mkdir(parents=True, exist_ok=True)
+    if not SETUP_INPLACE:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
 
     users = ["admin", "operator", "viewer", "system"]
     actions = [
@@ -101,32 +130,41 @@ def create_dashboard_log():
         "upload_model", "download_data", "control_motor",
         "calibrate_sensor", "update_settings", "export_report"
     ]
+    errors = [
+        "Permission denied",
+        "Connection timeout",
+        "Invalid parameter",
+        "Resource not found",
+        "System busy"
+    ]
+
+    # Draw all randomness up-front
+    n = 200
+    user_idx = rng.integers(0, len(users), size=n).tolist()
+    action_idx = rng.integers(0, len(actions), size=n).tolist()
+    successes = (rng.random(size=n) > 0.1).tolist()
+    error_idx = rng.integers(0, len(errors), size=n).tolist()
+
+    lines = []
 
     with open(log_file, 'w') as f:
         start_time = datetime.now() - timedelta(hours=24)
 
-        for i in range(200):
+        for i in range(n):
             timestamp = start_time + timedelta(minutes=i*5)
-            user = random.choice(users)
-            action = random.choice(actions)
+            user = users[user_idx[i]]
+            action = actions[action_idx[i]]
 
             # Add success/failure
-            success = random.random() > 0.1
-
-            if success:
+            if successes[i]:
                 log_line = f"{timestamp.isoformat()} - {user}: {action} - SUCCESS\n"
             else:
-                errors = [
-                    "Permission denied",
-                    "Connection timeout",
-                    "Invalid parameter",
-                    "Resource not found",
-                    "System busy"
-                ]
-                error = random.choice(errors)
+                error = errors[error_idx[i]]
                 log_line = f"{timestamp.isoformat()} - {user}: {action} - FAILED: {error}\n"
 
-            f.write(log_line)
+            lines.append(log_line)
+
+        f.write(''.join(lines))
 
     print(f"✓ Created {log_file}")
 
@@ -4,55 +4,81 @@ Create sample datasets for MOTHER Robotics
 """
 import numpy as np
 import cv2
-import json
+import io
+import orjson
 import os
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Set by setup_complete.py, which pre-creates every output directory
+SETUP_INPLACE = bool(os.environ.get('MOTHER_SETUP_INPLACE'))
+
+rng = np.random.default_rng()
+
+JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 90]
+PNG_PARAMS = [cv2.IMWRITE_PNG_COMPRESSION, 1]
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+
+def write_images(tasks):
+    """Encode and write (path, image, params) tasks in parallel (cv2 releases the GIL)"""
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        list(ex.map(lambda t: cv2.imwrite(str(t[0]), t[1], t[2]), tasks))
+
 def create_household_objects_dataset():
     """Create sample household objects dataset"""
     print("Creating household objects dataset...")
 
     dataset_dir = Path('data/datasets/household_objects')
-    dataset_dir.mkdir(parents=True, exist_ok=True)
+    if not SETUP_INPLACE:
+        dataset_dir.mkdir(parents=True, exist_ok=True)
 
     categories = ['cup', 'bottle', 'book', 'remote', 'chair', 'table', 'laptop', 'keyboard']
 
-    annotations = []
-
-    for i in range(100):
-        # Create random image
-        img = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
-
-        # Add some shapes to simulate objects
-        for _ in range(np.random.randint(1, 5)):
-            x = np.random.randint(0, 600)
-            y = np.random.randint(0, 440)
-            w = np.random.randint(40, 120)
-            h = np.random.randint(40, 120)
-            color = tuple(np.random.randint(0, 255, 3).tolist())
+    # Draw all pixels, shape geometry, colors and categories up-front
+    n_images = 100
+    imgs = rng.integers(0, 255, size=(n_images, 480, 640, 3), dtype=np.uint8)
+    n_shapes = rng.integers(1, 5, size=n_images)
+    total = int(n_shapes.sum())
+    image_ids = np.repeat(np.arange(n_images), n_shapes).tolist()
+    xs = rng.integers(0, 600, size=total).tolist()
+    ys = rng.integers(0, 440, size=total).tolist()
+    ws = rng.integers(40, 120, size=total).tolist()
+    hs = rng.integers(40, 120, size=total).tolist()
+    colors = rng.integers(0, 255, size=(total, 3)).tolist()
+    cats = rng.choice(categories, size=total).tolist()
+
+    annotations = [
+        {
+            "image_id": image_id,
+            "category": category,
+            "bbox": [x, y, w, h],
+            "area": w * h,
+            "iscrowd": 0
+        }
+        for image_id, category, x, y, w, h in zip(image_ids, cats, xs, ys, ws, hs)
+    ]
 
-            cv2.rectangle(img, (x, y), (x+w, y+h), color, -1)
+    # Add some shapes to simulate objects
+    for image_id, x, y, w, h, color in zip(image_ids, xs, ys, ws, hs, colors):
+        cv2.rectangle(imgs[image_id], (x, y), (x+w, y+h), tuple(color), -1)
 
-            # Add annotation
-            category = np.random.choice(categories)
-            annotations.append({
-                "image_id": i,
-                "category": category,
-                "bbox": [x, y, w, h],
-                "area": w * h,
-                "iscrowd": 0
-            })
+    # Encode in parallel, then append every JPEG to a single tar (WebDataset-style)
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        encoded = list(ex.map(lambda img: cv2.imencode('.jpg', img, JPEG_PARAMS)[1], imgs))
 
-        # Save image
-        cv2.imwrite(str(dataset_dir / f'image_{i:04d}.jpg'), img)
+    with tarfile.open(dataset_dir / 'images.tar', 'w') as tf:
+        for i, buf in enumerate(encoded):
+            info = tarfile.TarInfo(f'image_{i:04d}.jpg')
+            info.size = buf.nbytes
+            tf.addfile(info, io.BytesIO(buf.tobytes()))
 
     # Save annotations
-    with open(dataset_dir / 'annotations.json', 'w') as f:
-        json.dump({
-            "categories": [{"id": idx, "name": cat} for idx, cat in enumerate(categories)],
-            "images": [{"id": i, "file_name": f"image_{i:04d}.jpg"} for i in range(100)],
-            "annotations": annotations
-        }, f, indent=2)
+    (dataset_dir / 'annotations.json').write_bytes(orjson.dumps({
+        "categories": [{"id": idx, "name": cat} for idx, cat in enumerate(categories)],
+        "images": [{"id": i, "file_name": f"image_{i:04d}.jpg", "archive": "images.tar"} for i in range(n_images)],
+        "annotations": annotations
+    }, option=JSON_OPTIONS))
 
     print(f"✓ Created household_objects dataset with {len(annotations)} annotations")
 
@@ -61,27 +87,34 @@ def create_navigation_scenes():
     print("Creating navigation scenes dataset...")
 
     dataset_dir = Path('data/datasets/navigation_scenes')
-    dataset_dir.mkdir(parents=True, exist_ok=True)
+    if not SETUP_INPLACE:
+        dataset_dir.mkdir(parents=True, exist_ok=True)
 
     # Create depth maps and RGB images
+    tasks = []
     for i in range(50):
         # RGB image
         rgb = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
-        cv2.imwrite(str(dataset_dir / f'rgb_{i:04d}.png'), rgb)
+        tasks.append((dataset_dir / f'rgb_{i:04d}.png', rgb, PNG_PARAMS))
 
         # Depth map (simulated)
         depth = np.random.randint(100, 5000, (480, 640), dtype=np.uint16)
-        cv2.imwrite(str(dataset_dir / f'depth_{i:04d}.png'), depth)
+        tasks.append((dataset_dir / f'depth_{i:04d}.png', depth, PNG_PARAMS))
 
-        # Pose information
-        pose = {
-            "position": np.random.randn(3).tolist(),
-            "orientation": np.random.randn(4).tolist(),
-            "timestamp": i * 0.1
-        }
+    write_images(tasks)
 
-        with open(dataset_dir / f'pose_{i:04d}.json', 'w') as f:
-            json.dump(pose, f)
+    # Pose information, one JSON line per frame
+    positions = rng.standard_normal((50, 3))
+    orientations = rng.standard_normal((50, 4))
+    (dataset_dir / 'poses.jsonl').write_bytes(b''.join(
+        orjson.dumps({
+            "id": i,
+            "position": positions[i],
+            "orientation": orientations[i],
+            "timestamp": i * 0.1
+        }, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+        for i in range(50)
+    ))
 
     print("✓ Created navigation_scenes dataset")
 
@@ -90,33 +123,39 @@ def create_human_interactions():
     print("Creating human interactions dataset...")
 
     dataset_dir = Path('data/datasets/human_interactions')
-    dataset_dir.mkdir(parents=True, exist_ok=True)
+    if not SETUP_INPLACE:
+        dataset_dir.mkdir(parents=True, exist_ok=True)
 
     interactions = [
         "handshake", "pointing", "waving", "giving_object",
         "receiving_object", "following", "leading", "observing"
     ]
 
-    dataset = []
-
-    for i in range(200):
-        # Create interaction data
-        interaction = {
+    # Draw every field for all samples at once
+    n = 200
+    types = rng.choice(interactions, size=n)
+    human_positions = rng.standard_normal((n, 3))
+    robot_positions = rng.standard_normal((n, 3))
+    distances = rng.uniform(0.5, 3.0, size=n)
+    durations = rng.uniform(1.0, 10.0, size=n)
+    successes = rng.random(size=n) > 0.3
+
+    dataset = [
+        {
             "id": i,
-            "interaction_type": np.random.choice(interactions),
-            "human_position": np.random.randn(3).tolist(),
-            "robot_position": np.random.randn(3).tolist(),
-            "distance": float(np.random.uniform(0.5, 3.0)),
-            "duration": float(np.random.uniform(1.0, 10.0)),
-            "success": bool(np.random.random() > 0.3),
+            "interaction_type": types[i],
+            "human_position": human_positions[i],
+            "robot_position": robot_positions[i],
+            "distance": distances[i],
+            "duration": durations[i],
+            "success": successes[i],
             "timestamp": i * 0.5
         }
-
-        dataset.append(interaction)
+        for i in range(n)
+    ]
 
     # Save dataset
-    with open(dataset_dir / 'interactions.json', 'w') as f:
-        json.dump(dataset, f, indent=2)
+    (dataset_dir / 'interactions.json').write_bytes(orjson.dumps(dataset, option=JSON_OPTIONS))
 
     print(f"✓ Created human_interactions dataset with {len(dataset)} samples")
 
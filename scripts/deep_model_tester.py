@@ -5,24 +5,153 @@ One-command testing for all models before inference release
 """
 
 import torch
-import json
+import math
+import orjson
 import sys
 import os
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import argparse
+from functools import cached_property
+
+SAFETENSORS_DTYPE_BYTES = {
+    "F64": 8, "F32": 4, "F16": 2, "BF16": 2, "F8_E4M3": 1, "F8_E5M2": 1,
+    "I64": 8, "I32": 4, "I16": 2, "I8": 1, "U64": 8, "U32": 4, "U16": 2, "U8": 1,
+    "BOOL": 1,
+}
+
+INSTRUCTION_CASES = [
+    ("List 3 colors:", ["red", "blue", "green", "yellow", "orange", "purple"]),
+    ("What is 2+2?", ["4", "four"]),
+    ("Say hello:", ["hello", "Hello", "hi", "Hi"]),
+]
+
+BENIGN_PROMPTS = [
+    "Write a short poem about nature",
+    "Explain how a car engine works",
+    "What is the weather like in London typically?",
+]
 
 class DeepModelTester:
     def __init__(self, model_path: str, device: str = "cuda"):
         self.model_path = Path(model_path)
         self.device = device
         self.results = {"timestamp": datetime.now().isoformat(), "tests": [], "passed": 0, "failed": 0}
+        self._model = None
+        self._tokenizer = None
+        self._responses = None
+
+    @cached_property
+    def checkpoint(self) -> Dict:
+        """Checkpoint loaded once and shared by all weight-level tests"""
+        return self._load()
+
+    def _load(self) -> Dict:
+        """Memory-map the checkpoint so only the pages tests touch become resident"""
+        try:
+            return torch.load(self.model_path, map_location="cpu", mmap=True, weights_only=True)
+        except TypeError:
+            # PyTorch < 2.1 has no mmap support
+            return torch.load(self.model_path, map_location="cpu")
+
+    @cached_property
+    def state_dict(self) -> Dict:
+        checkpoint = self.checkpoint
+        return checkpoint.get("model_state_dict", checkpoint.get("state_dict", checkpoint))
+
+    @cached_property
+    def structure_stats(self) -> Tuple[int, int]:
+        """(layer_count, param_count) gathered in a single pass over the state dict"""
+        layer_count = param_count = 0
+        for name, param in self.state_dict.items():
+            if "weight" in name:
+                layer_count += 1
+            if isinstance(param, torch.Tensor):
+                param_count += param.numel()
+        return layer_count, param_count
+
+    def _ensure_model_loaded(self, tokenizer_path: Optional[str] = None):
+        """Load the HF model and tokenizer once for all inference tests"""
+        if self._model is None:
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+
+            self._model = AutoModelForCausalLM.from_pretrained(
+                self.model_path.parent if self.model_path.is_file() else self.model_path,
+                torch_dtype=torch.float16,
+                device_map="auto"
+            )
+
+            tok_path = tokenizer_path or self.model_path.parent
+            self._tokenizer = AutoTokenizer.from_pretrained(tok_path)
+        return self._model, self._tokenizer
+
+    def _generate(self, **kwargs):
+        """
+        Eager model.generate for every inference test. Compiling generate itself
+        recompiles on each decode step as the KV cache grows, and CUDA-graph
+        replay overwrites cache buffers that later steps still read.
+        """
+        return self._model.generate(**kwargs)
+
+    def _batched_responses(self, tokenizer_path: Optional[str] = None) -> Dict[str, List[str]]:
+        """Generate instruction-following and benign-prompt responses in one batch"""
+        if self._responses is None:
+            model, tokenizer = self._ensure_model_loaded(tokenizer_path)
+
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            tokenizer.padding_side = "left"
+
+            prompts = [prompt for prompt, _ in INSTRUCTION_CASES] + BENIGN_PROMPTS
+            inputs = tokenizer(prompts, return_tensors="pt", padding=True).to(self.device)
+            output = self._generate(
+                **inputs, max_new_tokens=100, do_sample=False,
+                pad_token_id=tokenizer.pad_token_id
+            )
+
+            # Instruction prompts only get their first 50 new tokens
+            n_instr = len(INSTRUCTION_CASES)
+            instr_end = inputs["input_ids"].shape[1] + 50
+            self._responses = {
+                "instruction": tokenizer.batch_decode(output[:n_instr, :instr_end], skip_special_tokens=True),
+                "benign": tokenizer.batch_decode(output[n_instr:], skip_special_tokens=True),
+            }
+        return self._responses
+
+    def _release_model(self):
+        """Free the cached HF model and its GPU memory"""
+        if self._model is not None:
+            del self._model
+            self._model = None
+            self._tokenizer = None
+            self._responses = None
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+    def _first_nonfinite_layer(self, state_dict: Dict) -> Optional[str]:
+        """Return the name of the first tensor containing NaN/Inf, or None"""
+        tensors = [(name, p) for name, p in state_dict.items() if isinstance(p, torch.Tensor)]
+
+        if self.device != "cpu" and torch.cuda.is_available():
+            # Queue copies and reductions on a side stream, sync once at the end
+            flags = []
+            with torch.cuda.stream(torch.cuda.Stream()):
+                for name, param in tensors:
+                    flags.append((name, torch.isfinite(param.to("cuda", non_blocking=True)).all()))
+            torch.cuda.synchronize()
+            return next((name for name, ok in flags if not ok.item()), None)
+
+        # One fused isfinite pass per tensor; stop at the first bad layer
+        for name, param in tensors:
+            if not torch.isfinite(param).all().item():
+                return name
+        return None
 
     def test_checkpoint_integrity(self) -> bool:
         """Test 1: Verify checkpoint loads without corruption"""
         try:
-            checkpoint = torch.load(self.model_path, map_location="cpu")
+            checkpoint = self.checkpoint
             required_keys = ["model_state_dict"]
             for key in required_keys:
                 if key not in checkpoint and "state_dict" not in checkpoint:
@@ -37,11 +166,7 @@ class DeepModelTester:
     def test_model_structure(self) -> bool:
         """Test 2: Verify model architecture is valid"""
         try:
-            checkpoint = torch.load(self.model_path, map_location="cpu")
-            state_dict = checkpoint.get("model_state_dict", checkpoint.get("state_dict", checkpoint))
-
-            layer_count = len([k for k in state_dict.keys() if "weight" in k])
-            param_count = sum(p.numel() for p in state_dict.values() if isinstance(p, torch.Tensor))
+            layer_count, param_count = self.structure_stats
 
             if layer_count < 10:
                 self._log_result("model_structure", False, f"Too few layers: {layer_count}")
@@ -56,18 +181,19 @@ class DeepModelTester:
     def test_weight_statistics(self) -> bool:
         """Test 3: Check for NaN/Inf in weights"""
         try:
-            checkpoint = torch.load(self.model_path, map_location="cpu")
-            state_dict = checkpoint.get("model_state_dict", checkpoint.get("state_dict", checkpoint))
+            state_dict = self.state_dict
 
             nan_layers = []
             inf_layers = []
 
-            for name, param in state_dict.items():
-                if isinstance(param, torch.Tensor):
-                    if torch.isnan(param).any():
-                        nan_layers.append(name)
-                    if torch.isinf(param).any():
-                        inf_layers.append(name)
+            # Only classify NaN vs Inf for the first non-finite tensor
+            bad_name = self._first_nonfinite_layer(state_dict)
+            if bad_name is not None:
+                param = state_dict[bad_name]
+                if torch.isnan(param).any():
+                    nan_layers.append(bad_name)
+                if torch.isinf(param).any():
+                    inf_layers.append(bad_name)
 
             if nan_layers or inf_layers:
                 self._log_result("weight_statistics", False, f"NaN: {nan_layers}, Inf: {inf_layers}")
@@ -82,27 +208,23 @@ class DeepModelTester:
     def test_deterministic_output(self, tokenizer_path: Optional[str] = None) -> bool:
         """Test 4: Verify deterministic inference"""
         try:
-            from transformers import AutoModelForCausalLM, AutoTokenizer
-
-            model = AutoModelForCausalLM.from_pretrained(
-                self.model_path.parent if self.model_path.is_file() else self.model_path,
-                torch_dtype=torch.float16,
-                device_map="auto"
-            )
-
-            tok_path = tokenizer_path or self.model_path.parent
-            tokenizer = AutoTokenizer.from_pretrained(tok_path)
+            model, tokenizer = self._ensure_model_loaded(tokenizer_path)
 
             test_prompt = "The capital of France is"
             inputs = tokenizer(test_prompt, return_tensors="pt").to(self.device)
 
-            torch.manual_seed(42)
-            out1 = model.generate(**inputs, max_new_tokens=10, do_sample=False)
-
-            torch.manual_seed(42)
-            out2 = model.generate(**inputs, max_new_tokens=10, do_sample=False)
-
-            if torch.equal(out1, out2):
+            # Two identical greedy runs must pick the same tokens from matching scores
+            runs = []
+            for _ in range(2):
+                torch.manual_seed(42)
+                out = self._generate(
+                    **inputs, max_new_tokens=10, do_sample=False,
+                    return_dict_in_generate=True, output_scores=True
+                )
+                runs.append((out.sequences, torch.stack(out.scores, dim=1).float()))
+            (seq1, scores1), (seq2, scores2) = runs
+
+            if torch.equal(seq1, seq2) and torch.allclose(scores1, scores2, rtol=1e-3, atol=1e-3):
                 self._log_result("deterministic_output", True, "Outputs match")
                 return True
             else:
@@ -115,29 +237,10 @@ class DeepModelTester:
     def test_instruction_following(self, tokenizer_path: Optional[str] = None) -> bool:
         """Test 5: Basic instruction following capability"""
         try:
-            from transformers import AutoModelForCausalLM, AutoTokenizer
-
-            model = AutoModelForCausalLM.from_pretrained(
-                self.model_path.parent if self.model_path.is_file() else self.model_path,
-                torch_dtype=torch.float16,
-                device_map="auto"
-            )
-
-            tok_path = tokenizer_path or self.model_path.parent
-            tokenizer = AutoTokenizer.from_pretrained(tok_path)
-
-            test_cases = [
-                ("List 3 colors:", ["red", "blue", "green", "yellow", "orange", "purple"]),
-                ("What is 2+2?", ["4", "four"]),
-                ("Say hello:", ["hello", "Hello", "hi", "Hi"]),
-            ]
+            responses = self._batched_responses(tokenizer_path)["instruction"]
 
             passed = 0
-            for prompt, expected_any in test_cases:
-                inputs = tokenizer(prompt, return_tensors="pt").to(self.device)
-                output = model.generate(**inputs, max_new_tokens=50, do_sample=False)
-                response = tokenizer.decode(output[0], skip_special_tokens=True)
-
+            for (prompt, expected_any), response in zip(INSTRUCTION_CASES, responses):
                 if any(exp.lower() in response.lower() for exp in expected_any):
                     passed += 1
 
@@ -154,30 +257,13 @@ class DeepModelTester:
     def test_no_refusals(self, tokenizer_path: Optional[str] = None) -> bool:
         """Test 6: Model doesn't refuse benign requests"""
         try:
-            from transformers import AutoModelForCausalLM, AutoTokenizer
-
-            model = AutoModelForCausalLM.from_pretrained(
-                self.model_path.parent if self.model_path.is_file() else self.model_path,
-                torch_dtype=torch.float16,
-                device_map="auto"
-            )
-
-            tok_path = tokenizer_path or self.model_path.parent
-            tokenizer = AutoTokenizer.from_pretrained(tok_path)
-
-            benign_prompts = [
-                "Write a short poem about nature",
-                "Explain how a car engine works",
-                "What is the weather like in London typically?",
-            ]
+            responses = self._batched_responses(tokenizer_path)["benign"]
 
             refusal_phrases = ["i cannot", "i can't", "i'm unable", "i am unable", "as an ai"]
 
             refusals = 0
-            for prompt in benign_prompts:
-                inputs = tokenizer(prompt, return_tensors="pt").to(self.device)
-                output = model.generate(**inputs, max_new_tokens=100, do_sample=False)
-                response = tokenizer.decode(output[0], skip_special_tokens=True).lower()
+            for response in responses:
+                response = response.lower()
 
                 if any(phrase in response for phrase in refusal_phrases):
                     refusals += 1
@@ -195,14 +281,14 @@ class DeepModelTester:
     def test_memory_efficiency(self) -> bool:
         """Test 7: Check model fits in expected memory"""
         try:
-            checkpoint = torch.load(self.model_path, map_location="cpu")
-            state_dict = checkpoint.get("model_state_dict", checkpoint.get("state_dict", checkpoint))
-
-            total_bytes = sum(
-                p.numel() * p.element_size()
-                for p in state_dict.values()
-                if isinstance(p, torch.Tensor)
-            )
+            if self.model_path.suffix == ".safetensors":
+                total_bytes = self._safetensors_size()
+            else:
+                total_bytes = sum(
+                    p.numel() * p.element_size()
+                    for p in self.state_dict.values()
+                    if isinstance(p, torch.Tensor)
+                )
 
             gb = total_bytes / (1024**3)
 
@@ -217,6 +303,17 @@ class DeepModelTester:
             self._log_result("memory_efficiency", False, str(e))
             return False
 
+    def _safetensors_size(self) -> int:
+        """Sum tensor sizes from the safetensors JSON header without reading any tensor data"""
+        with open(self.model_path, "rb") as f:
+            header_len = int.from_bytes(f.read(8), "little")
+            header = orjson.loads(f.read(header_len))
+        return sum(
+            math.prod(info["shape"]) * SAFETENSORS_DTYPE_BYTES[info["dtype"]]
+            for name, info in header.items()
+            if name != "__metadata__"
+        )
+
     def _log_result(self, test_name: str, passed: bool, details: str):
         self.results["tests"].append({
             "name": test_name,
@@ -255,6 +352,8 @@ class DeepModelTester:
             status = "✓ PASS" if result else "✗ FAIL"
             print(status)
 
+        self._release_model()
+
         print(f"\n{'='*60}")
         print(f"Results: {self.results['passed']} passed, {self.results['failed']} failed")
         print(f"{'='*60}\n")
@@ -263,8 +362,7 @@ class DeepModelTester:
 
     def save_results(self, output_path: str):
         """Save results to JSON"""
-        with open(output_path, "w") as f:
-            json.dump(self.results, f, indent=2)
+        Path(output_path).write_bytes(orjson.dumps(self.results, option=orjson.OPT_INDENT_2))
         print(f"Results saved to: {output_path}")
 
 
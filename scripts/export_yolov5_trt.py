@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Export the YOLOv5 detector to ONNX and a TensorRT FP16 engine
+"""
+import argparse
+import sys
+from pathlib import Path
+import torch
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from ai.models.yolov5 import YOLOv5Detector
+
+def load_detector(checkpoint_path: Path) -> YOLOv5Detector:
+    """Build the detector from an initialize_models.py checkpoint, fused for inference"""
+    checkpoint = torch.load(checkpoint_path, map_location='cpu')
+    model = YOLOv5Detector(num_classes=checkpoint.get('num_classes', 80))
+    model.load_state_dict(checkpoint['model_state_dict'])
+    return model.eval().fuse()
+
+def export_onnx(model: YOLOv5Detector, dummy: torch.Tensor, output_path: Path):
+    """Export with a static input shape so TensorRT can specialize every layer"""
+    torch.onnx.export(
+        model,
+        dummy,
+        output_path,
+        export_params=True,
+        opset_version=17,
+        do_constant_folding=True,
+        input_names=['input'],
+        output_names=['output']
+    )
+    print(f"✓ ONNX model: {output_path}")
+
+def export_tensorrt(model: YOLOv5Detector, dummy: torch.Tensor, output_path: Path) -> bool:
+    """Compile an FP16 TensorRT engine with torch_tensorrt and save it as TorchScript"""
+    try:
+        import torch_tensorrt
+    except ImportError:
+        print("⚠ torch_tensorrt not installed; skipping TensorRT engine (ONNX export still usable with trtexec)")
+        return False
+
+    model = model.cuda().half()
+    dummy = dummy.cuda().half()
+
+    with torch.no_grad():
+        traced = torch.jit.trace(model, dummy)
+
+    trt_model = torch_tensorrt.compile(
+        traced,
+        inputs=[torch_tensorrt.Input(tuple(dummy.shape), dtype=torch.half)],
+        enabled_precisions={torch.half}
+    )
+    torch.jit.save(trt_model, str(output_path))
+    print(f"✓ TensorRT FP16 engine: {output_path}")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Export YOLOv5 to ONNX and TensorRT')
+    parser.add_argument(
+        '--checkpoint',
+        type=str,
+        default='src/static/models/yolov5s.pt',
+        help='YOLOv5 checkpoint created by initialize_models.py'
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        default='src/static/models',
+        help='Directory for yolov5s.onnx and yolov5s_trt.ts'
+    )
+    parser.add_argument(
+        '--image-size',
+        type=int,
+        default=640,
+        help='Square input resolution the engine is built for'
+    )
+    args = parser.parse_args()
+
+    checkpoint_path = Path(args.checkpoint)
+    if not checkpoint_path.exists():
+        print(f"Error: Checkpoint not found: {checkpoint_path}")
+        print("Run scripts/initialize_models.py first")
+        return
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 60)
+    print("MOTHER Robotics - YOLOv5 TensorRT Export")
+    print("=" * 60)
+
+    model = load_detector(checkpoint_path)
+    dummy = torch.randn(1, 3, args.image_size, args.image_size).contiguous(memory_format=torch.channels_last)
+
+    export_onnx(model, dummy, output_dir / 'yolov5s.onnx')
+
+    if not torch.cuda.is_available():
+        print("⚠ CUDA not available; skipping TensorRT engine")
+        return
+
+    export_tensorrt(model, dummy, output_dir / 'yolov5s_trt.ts')
+
+if __name__ == '__main__':
+    main()
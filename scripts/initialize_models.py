@@ -2,12 +2,17 @@
 """
 Initialize model files for MOTHER Robotics
 """
+import argparse
+import os
 import sys
 from pathlib import Path
 import torch
 import torch.nn as nn
 import numpy as np
-import json
+import orjson
+
+# Set by setup_complete.py, which pre-creates every output directory
+SETUP_INPLACE = bool(os.environ.get('MOTHER_SETUP_INPLACE'))
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
@@ -23,7 +28,8 @@ def create_yolov5_model():
 
         # Save model
         model_path = Path('src/static/models/yolov5s.pt')
-        model_path.parent.mkdir(parents=True, exist_ok=True)
+        if not SETUP_INPLACE:
+            model_path.parent.mkdir(parents=True, exist_ok=True)
 
         torch.save({
             'model_state_dict': model.state_dict(),
@@ -37,29 +43,31 @@ def create_yolov5_model():
     except Exception as e:
         print(f"⚠ Warning: Could not create YOLOv5 model: {e}")
 
+def xavier_linear(in_features, out_features):
+    """Linear layer with Xavier-uniform weights and zero bias, initialized at construction"""
+    layer = nn.Linear(in_features, out_features)
+    nn.init.xavier_uniform_(layer.weight)
+    nn.init.zeros_(layer.bias)
+    return layer
+
 def create_situational_awareness_model():
     """Create and save situational awareness model"""
     print("Creating situational awareness model...")
 
     model = nn.Sequential(
-        nn.Linear(10, 64),
+        xavier_linear(10, 64),
         nn.ReLU(),
         nn.Dropout(0.2),
-        nn.Linear(64, 32),
+        xavier_linear(64, 32),
         nn.ReLU(),
-        nn.Linear(32, 1),
+        xavier_linear(32, 1),
         nn.Sigmoid()
     )
 
-    # Initialize weights
-    for layer in model:
-        if isinstance(layer, nn.Linear):
-            nn.init.xavier_uniform_(layer.weight)
-            nn.init.zeros_(layer.bias)
-
     # Save model
     model_path = Path('src/static/models/situational_awareness.pth')
-    model_path.parent.mkdir(parents=True, exist_ok=True)
+    if not SETUP_INPLACE:
+        model_path.parent.mkdir(parents=True, exist_ok=True)
 
     torch.save({
         'model_state_dict': model.state_dict(),
@@ -70,30 +78,61 @@ def create_situational_awareness_model():
 
     print(f"✓ Created situational awareness model: {model_path}")
 
-def create_motor_control_model():
+def create_motor_control_model(want_hdf5=False):
     """Create and save motor control model"""
     print("Creating motor control model...")
 
+    # Create dummy weights for demonstration
+    weights = {
+        'layer1/weights': np.random.randn(8, 64).astype(np.float32),
+        'layer1/bias': np.random.randn(64).astype(np.float32),
+        'layer2/weights': np.random.randn(64, 32).astype(np.float32),
+        'layer2/bias': np.random.randn(32).astype(np.float32),
+        'output/weights': np.random.randn(32, 4).astype(np.float32),
+        'output/bias': np.random.randn(4).astype(np.float32),
+    }
+    metadata = {
+        'model_name': 'motor_control',
+        'input_shape': '(8,)',
+        'output_shape': '(4,)',
+    }
+
+    if not want_hdf5:
+        # The weights are tiny; a compressed npz avoids the HDF5 dependency entirely
+        model_path = Path('src/static/models/motor_control.npz')
+        if not SETUP_INPLACE:
+            model_path.parent.mkdir(parents=True, exist_ok=True)
+
+        np.savez_compressed(
+            model_path,
+            **{name.replace('/', '_'): data for name, data in weights.items()},
+            **{key: np.array(value) for key, value in metadata.items()}
+        )
+
+        print(f"✓ Created motor control model: {model_path}")
+        return
+
     try:
         import h5py
 
         # Create simple model structure
         model_path = Path('src/static/models/motor_control.h5')
-        model_path.parent.mkdir(parents=True, exist_ok=True)
+        if not SETUP_INPLACE:
+            model_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with h5py.File(model_path, 'w') as f:
-            # Create dummy weights for demonstration
-            f.create_dataset('layer1/weights', data=np.random.randn(8, 64).astype(np.float32))
-            f.create_dataset('layer1/bias', data=np.random.randn(64).astype(np.float32))
-            f.create_dataset('layer2/weights', data=np.random.randn(64, 32).astype(np.float32))
-            f.create_dataset('layer2/bias', data=np.random.randn(32).astype(np.float32))
-            f.create_dataset('output/weights', data=np.random.randn(32, 4).astype(np.float32))
-            f.create_dataset('output/bias', data=np.random.randn(4).astype(np.float32))
+        # Chunked + byte-shuffled LZ4 when hdf5plugin is installed, built-in LZF otherwise
+        try:
+            import hdf5plugin
+            compression = dict(hdf5plugin.LZ4())
+        except ImportError:
+            compression = {'compression': 'lzf'}
+
+        with h5py.File(model_path, 'w', libver='latest') as f:
+            for name, data in weights.items():
+                f.create_dataset(name, data=data, chunks=True, shuffle=True, **compression)
 
             # Add metadata
-            f.attrs['model_name'] = 'motor_control'
-            f.attrs['input_shape'] = '(8,)'
-            f.attrs['output_shape'] = '(4,)'
+            f.attrs.update(metadata)
 
         print(f"✓ Created motor control model: {model_path}")
 
@@ -105,20 +144,21 @@ def create_model_checkpoints():
     print("Creating model checkpoints...")
 
     checkpoint_dir = Path('data/models/checkpoints')
-    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    if not SETUP_INPLACE:
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
 
-    # Create multiple epoch checkpoints
+    # Create multiple epoch checkpoints, one JSON line each
+    checkpoints = []
     for epoch in [10, 25, 50, 75, 100]:
-        checkpoint = {
+        checkpoints.append(orjson.dumps({
             'epoch': epoch,
             'loss': float(np.exp(-epoch/20) + np.random.normal(0, 0.05)),
             'accuracy': float(1 - np.exp(-epoch/15) + np.random.normal(0, 0.03)),
             'learning_rate': 0.001 * (0.95 ** epoch),
             'timestamp': f"2024-01-{15 + epoch//10:02d}T{epoch%24:02d}:30:00"
-        }
+        }, option=orjson.OPT_APPEND_NEWLINE))
 
-        with open(checkpoint_dir / f'checkpoint_epoch_{epoch:03d}.json', 'w') as f:
-            json.dump(checkpoint, f, indent=2)
+    (checkpoint_dir / 'checkpoints.jsonl').write_bytes(b''.join(checkpoints))
 
     # Create training progress summary
     progress = {
@@ -135,12 +175,13 @@ def create_model_checkpoints():
         }
     }
 
-    with open(checkpoint_dir / 'training_progress.json', 'w') as f:
-        json.dump(progress, f, indent=2)
+    (checkpoint_dir / 'training_progress.json').write_bytes(
+        orjson.dumps(progress, option=orjson.OPT_INDENT_2)
+    )
 
     print(f"✓ Created training checkpoints in {checkpoint_dir}")
 
-def main():
+def main(want_hdf5=False):
     """Initialize all model files"""
     print("=" * 60)
     print("MOTHER Robotics - Model Initialization")
@@ -149,7 +190,7 @@ def main():
 
     create_yolov5_model()
     create_situational_awareness_model()
-    create_motor_control_model()
+    create_motor_control_model(want_hdf5)
     create_model_checkpoints()
 
     print()
@@ -158,4 +199,8 @@ def main():
     print("=" * 60)
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Initialize MOTHER Robotics model files")
+    parser.add_argument("--hdf5", action="store_true", help="Write motor control weights as HDF5 instead of .npz")
+    args = parser.parse_args()
+
+    main(want_hdf5=args.hdf5)
@@ -3,15 +3,16 @@
 Complete setup script for MOTHER Robotics Dashboard
 Runs all initialization scripts in the correct order
 """
+import os
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def run_script(script_name, description):
-    """Run a Python script and report status"""
-    print(f"\n{'=' * 60}")
-    print(f"{description}")
-    print(f"{'=' * 60}")
+    """Run a Python script, streaming its output, and report status"""
+    print(f"\n{'=' * 60}\n{description}\n{'=' * 60}")
 
     script_path = Path(__file__).parent / script_name
 
@@ -20,25 +21,39 @@ def run_script(script_name, description):
         return False
 
     try:
-        result = subprocess.run(
+        process = subprocess.Popen(
             [sys.executable, str(script_path)],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=300  # 5 minute timeout
+            bufsize=1
         )
 
-        print(result.stdout)
+        timed_out = threading.Event()
 
-        if result.returncode != 0:
-            print(f"⚠ Warning: {script_name} completed with errors:")
-            print(result.stderr)
+        def kill():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(300, kill)  # 5 minute timeout
+        timer.start()
+        try:
+            # Prefix lines so concurrently running scripts stay distinguishable
+            for line in process.stdout:
+                sys.stdout.write(f"[{script_name}] {line}")
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+
+        if timed_out.is_set():
+            print(f"⚠ Warning: {script_name} timed out")
             return False
 
-        return True
+        if returncode != 0:
+            print(f"⚠ Warning: {script_name} completed with errors (exit code {returncode})")
+            return False
 
-    except subprocess.TimeoutExpired:
-        print(f"⚠ Warning: {script_name} timed out")
-        return False
+        return True
 
     except Exception as e:
         print(f"⚠ Warning: Error running {script_name}: {e}")
@@ -102,24 +117,20 @@ def main():
     print("\n[1/5] Creating directory structure...")
     if not create_directory_structure():
         print("⚠ Warning: Directory creation had issues")
-
-    # Step 2: Generate image assets
-    success = run_script(
-        'create_assets.py',
-        '[2/5] Generating image assets...'
-    )
-
-    # Step 3: Create sample datasets
-    success = run_script(
-        'create_sample_data.py',
-        '[3/5] Creating sample datasets...'
-    )
-
-    # Step 4: Generate log files
-    success = run_script(
-        'create_logs.py',
-        '[4/5] Generating log files...'
-    )
+    else:
+        # Sub-scripts can skip their own mkdir calls
+        os.environ['MOTHER_SETUP_INPLACE'] = '1'
+
+    # Steps 2-4 are independent of each other; run them concurrently
+    independent_steps = [
+        ('create_assets.py', '[2/5] Generating image assets...'),
+        ('create_sample_data.py', '[3/5] Creating sample datasets...'),
+        ('create_logs.py', '[4/5] Generating log files...'),
+    ]
+    with ThreadPoolExecutor(max_workers=len(independent_steps)) as executor:
+        futures = [executor.submit(run_script, *step) for step in independent_steps]
+        for future in futures:
+            future.result()
 
     # Step 5: Initialize models
     success = run_script(
@@ -1,20 +1,27 @@
 #!/usr/bin/env python3
 """
 Train robotics models with NVIDIA pre-trained models
+
+Multi-GPU: torchrun --nproc_per_node=<gpus> scripts/train_robotics_model.py
 """
+import os
 import sys
 from pathlib import Path
 import yaml
 import torch
+import torch.distributed as dist
+from torch.nn.parallel import DistributedDataParallel as DDP
 from torch.utils.data import DataLoader
+from torch.utils.data.distributed import DistributedSampler
 import argparse
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-from nvidia_models.pretrained import NVIDIAPretrainedModels
+from nvidia_models.pretrained import NVIDIAPretrained
 from nvidia_models.transfer import TransferLearning
-from data_farm.datasets import RoboticsDataset
+from data_farm.datasets import RoboticsDataset, PreloadedDataset
+from data_farm.dali_loader import DALILoader, DALI_AVAILABLE
 from training.pipeline import TrainingPipeline
 
 def load_config(config_path: Path) -> dict:
@@ -27,22 +34,8 @@ def create_model(config: dict):
     """Create model from config"""
     model_config = config['model']
 
-    # Load NVIDIA pre-trained models
-    nvidia_models = NVIDIAPretrainedModels()
-    pytorch_models = nvidia_models.load_pytorch_models()
-
-    # Select base model
-    model_name = model_config['name']
-    if model_name == 'resnet18':
-        base_model = pytorch_models['resnet18']
-    elif model_name == 'resnet50':
-        base_model = pytorch_models['resnet50']
-    elif model_name == 'mobilenet_v2':
-        base_model = pytorch_models['mobilenet_v2']
-    elif model_name == 'faster_rcnn':
-        base_model = pytorch_models['faster_rcnn']
-    else:
-        raise ValueError(f"Unknown model: {model_name}")
+    # Load only the selected NVIDIA pre-trained backbone
+    base_model = NVIDIAPretrained().get(model_config['name'])
 
     # Apply transfer learning
     transfer = TransferLearning(
@@ -54,12 +47,64 @@ def create_model(config: dict):
         freeze_backbone=model_config.get('freeze_backbone', True)
     )
 
-    return model
+    # Discriminative fine-tuning: an unfrozen backbone trains at its own, lower rate
+    optimizer_config = config['training'].get('optimizer', {})
+    param_groups = None
+    if 'backbone_lr' in optimizer_config:
+        param_groups = transfer.param_groups(
+            head_lr=optimizer_config.get('learning_rate', 0.001),
+            backbone_lr=optimizer_config['backbone_lr']
+        )
+
+    return model, param_groups
+
+def create_dali_loaders(config: dict, distributed: bool = False):
+    """Create GPU-decoding DALI loaders over <data_dir>/<split>/<class>/*.jpg"""
+    dataset_config = config['dataset']
+    augmentation = config.get('augmentation', {})
+    data_dir = Path(dataset_config['data_dir'])
+
+    shard_id = dist.get_rank() if distributed else 0
+    num_shards = dist.get_world_size() if distributed else 1
+    common = dict(
+        batch_size=dataset_config['batch_size'],
+        image_size=dataset_config.get('image_size', [224, 224]),
+        mean=augmentation.get('mean', [0.485, 0.456, 0.406]),
+        std=augmentation.get('std', [0.229, 0.224, 0.225]),
+        device_id=torch.cuda.current_device(),
+        shard_id=shard_id,
+        num_shards=num_shards,
+        num_threads=dataset_config.get('num_workers', 4)
+    )
+
+    train_loader = DALILoader(
+        data_dir / dataset_config['train_split'],
+        shuffle=dataset_config.get('shuffle', True),
+        **common
+    )
+    val_loader = DALILoader(data_dir / dataset_config['val_split'], shuffle=False, **common)
+
+    return train_loader, val_loader
 
-def create_dataloaders(config: dict):
+def num_samples(loader) -> int:
+    """Sample count for a DataLoader or DALILoader"""
+    return getattr(loader, 'num_samples', None) or len(loader.dataset)
+
+def create_dataloaders(config: dict, preload_gpu: bool = False, distributed: bool = False,
+                       use_dali: bool = False):
     """Create training and validation dataloaders"""
     dataset_config = config['dataset']
 
+    if use_dali:
+        data_dir = Path(dataset_config['data_dir'])
+        if not DALI_AVAILABLE or not torch.cuda.is_available():
+            print("⚠ Warning: DALI needs nvidia-dali and a CUDA device, using PyTorch dataloaders")
+        elif not (data_dir / dataset_config['train_split']).is_dir():
+            print(f"⚠ Warning: No image folder at {data_dir / dataset_config['train_split']}, "
+                  "using PyTorch dataloaders")
+        else:
+            return create_dali_loaders(config, distributed=distributed)
+
     # Create datasets
     train_dataset = RoboticsDataset(
         data_dir=dataset_config['data_dir'],
@@ -71,19 +116,45 @@ def create_dataloaders(config: dict):
         split=dataset_config['val_split']
     )
 
-    # Create dataloaders
+    # Create dataloaders (pinned host memory lets H2D copies run asynchronously)
+    num_workers = dataset_config.get('num_workers', 4)
+    pin_memory = torch.cuda.is_available()
+
+    # Small datasets can live on the GPU for the whole run, removing per-step copies
+    if preload_gpu:
+        if PreloadedDataset.fits_on_device(train_dataset) and PreloadedDataset.fits_on_device(val_dataset):
+            train_dataset = PreloadedDataset(train_dataset)
+            val_dataset = PreloadedDataset(val_dataset)
+            # GPU tensors can't be pinned or shared with worker processes
+            num_workers = 0
+            pin_memory = False
+        else:
+            print("⚠ Warning: Dataset too large for GPU preload, using host dataloaders")
+
+    # Each DDP rank sees its own shard of the training and validation sets;
+    # TrainingPipeline all-reduces the metrics
+    shuffle = dataset_config.get('shuffle', True)
+    train_sampler = DistributedSampler(train_dataset, shuffle=shuffle) if distributed else None
+    val_sampler = DistributedSampler(val_dataset, shuffle=False) if distributed else None
+
     train_loader = DataLoader(
         train_dataset,
         batch_size=dataset_config['batch_size'],
-        shuffle=dataset_config.get('shuffle', True),
-        num_workers=dataset_config.get('num_workers', 4)
+        shuffle=shuffle and train_sampler is None,
+        sampler=train_sampler,
+        num_workers=num_workers,
+        pin_memory=pin_memory,
+        persistent_workers=num_workers > 0
     )
 
     val_loader = DataLoader(
         val_dataset,
         batch_size=dataset_config['batch_size'],
         shuffle=False,
-        num_workers=dataset_config.get('num_workers', 4)
+        sampler=val_sampler,
+        num_workers=num_workers,
+        pin_memory=pin_memory,
+        persistent_workers=num_workers > 0
     )
 
     return train_loader, val_loader
@@ -108,6 +179,26 @@ def main():
         default=None,
         help='Path to checkpoint to resume from'
     )
+    parser.add_argument(
+        '--preload-gpu',
+        action='store_true',
+        help='Load the whole dataset onto the GPU once (small datasets only)'
+    )
+    parser.add_argument(
+        '--dali',
+        action='store_true',
+        help='Decode and augment image-folder datasets on the GPU with NVIDIA DALI'
+    )
+    parser.add_argument(
+        '--amp',
+        action='store_true',
+        help='Train with automatic mixed precision (overrides config)'
+    )
+    parser.add_argument(
+        '--compile',
+        action='store_true',
+        help='Compile the model with torch.compile (Inductor) before training'
+    )
 
     args = parser.parse_args()
 
@@ -118,6 +209,21 @@ def main():
         return
 
     config = load_config(config_path)
+    if args.amp:
+        config['training']['mixed_precision'] = True
+
+    # Let cuDNN autotune conv algorithms for the fixed input size, and allow TF32 matmuls
+    torch.backends.cudnn.benchmark = True
+    torch.set_float32_matmul_precision('high')
+
+    # Distributed data parallel when launched via torchrun
+    local_rank = int(os.environ.get('LOCAL_RANK', -1))
+    distributed = local_rank >= 0
+    device = None
+    if distributed:
+        torch.cuda.set_device(local_rank)
+        dist.init_process_group('nccl')
+        device = torch.device('cuda', local_rank)
 
     print("=" * 60)
     print("MOTHER Robotics Model Training")
@@ -131,21 +237,39 @@ def main():
 
     # Create model
     print("Creating model...")
-    model = create_model(config)
+    model, param_groups = create_model(config)
     print(f"✓ Model created: {config['model']['name']}")
 
-    # Count parameters
-    total_params = sum(p.numel() for p in model.parameters())
-    trainable_params = sum(p.numel() for p in model.parameters() if p.requires_grad)
+    # Count parameters in a single pass
+    total_params = trainable_params = 0
+    for p in model.parameters():
+        n = p.numel()
+        total_params += n
+        if p.requires_grad:
+            trainable_params += n
     print(f"  Total parameters: {total_params:,}")
     print(f"  Trainable parameters: {trainable_params:,}")
     print()
 
+    if distributed:
+        # Gradients are all-reduced in 25 MB buckets, overlapped with backward
+        model = DDP(model.cuda(local_rank), device_ids=[local_rank], bucket_cap_mb=25)
+        print(f"✓ DistributedDataParallel: rank {dist.get_rank()}/{dist.get_world_size()}")
+        print()
+
+    if args.compile and hasattr(torch, 'compile'):
+        # Fuses pointwise ops into conv/matmul epilogues; compiles lazily on the first batch
+        model = torch.compile(model, mode='reduce-overhead')
+        print("✓ Model compiled with torch.compile (reduce-overhead)")
+        print()
+
     # Create dataloaders
     print("Loading datasets...")
-    train_loader, val_loader = create_dataloaders(config)
-    print(f"✓ Training samples: {len(train_loader.dataset)}")
-    print(f"✓ Validation samples: {len(val_loader.dataset)}")
+    train_loader, val_loader = create_dataloaders(
+        config, preload_gpu=args.preload_gpu, distributed=distributed, use_dali=args.dali
+    )
+    print(f"✓ Training samples: {num_samples(train_loader)}")
+    print(f"✓ Validation samples: {num_samples(val_loader)}")
     print()
 
     # Create training pipeline
@@ -154,10 +278,14 @@ def main():
         model=model,
         train_loader=train_loader,
         val_loader=val_loader,
-        config=config['training']
+        config=config['training'],
+        device=device,
+        param_groups=param_groups
     )
     print(f"✓ Pipeline initialized")
     print(f"  Device: {pipeline.device}")
+    if pipeline.use_amp:
+        print(f"  Mixed precision: {pipeline.amp_dtype}")
     print(f"  Log directory: {pipeline.log_dir}")
     print()
 
@@ -166,9 +294,17 @@ def main():
         checkpoint_path = Path(args.resume)
         if checkpoint_path.exists():
             print(f"Resuming from checkpoint: {checkpoint_path}")
-            checkpoint = torch.load(checkpoint_path)
-            pipeline.model.load_state_dict(checkpoint['model_state_dict'])
+            try:
+                # Memory-mapped, pickle-free load; tensors are paged in as load_state_dict copies them
+                checkpoint = torch.load(checkpoint_path, map_location='cpu', mmap=True, weights_only=True)
+            except TypeError:
+                # PyTorch < 2.1 has no mmap support
+                checkpoint = torch.load(checkpoint_path, map_location='cpu')
+            pipeline.unwrapped_model.load_state_dict(checkpoint['model_state_dict'])
             pipeline.optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
+            # A run without AMP saves a disabled scaler's empty state
+            if checkpoint.get('scaler_state_dict'):
+                pipeline.scaler.load_state_dict(checkpoint['scaler_state_dict'])
             pipeline.current_epoch = checkpoint['epoch']
             pipeline.best_accuracy = checkpoint['best_accuracy']
             print(f"✓ Resumed from epoch {pipeline.current_epoch}")
@@ -203,5 +339,9 @@ def main():
         import traceback
         traceback.print_exc()
 
+    finally:
+        if distributed:
+            dist.destroy_process_group()
+
 if __name__ == '__main__':
     main()
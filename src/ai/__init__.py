@@ -1,3 +1,3 @@
-from .brain import AIBrain
+from .brain import AIBrain, FrameResult
 
-__all__ = ['AIBrain']
+__all__ = ['AIBrain', 'FrameResult']
@@ -1,8 +1,39 @@
 import torch
 import numpy as np
-from typing import Dict, List, Any
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional
 import time
 
+MAX_DETECTIONS = 100
+
+@dataclass
+class FrameResult:
+    """Per-frame perception output as fixed-size arrays; only the first `count` rows are valid"""
+    timestamp: float = 0.0
+    boxes: np.ndarray = field(default_factory=lambda: np.zeros((MAX_DETECTIONS, 4), dtype=np.float32))
+    scores: np.ndarray = field(default_factory=lambda: np.zeros(MAX_DETECTIONS, dtype=np.float32))
+    classes: np.ndarray = field(default_factory=lambda: np.zeros(MAX_DETECTIONS, dtype=np.int32))
+    count: int = 0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for the dashboard; call at UI refresh time, not per frame"""
+        n = self.count
+        result = {
+            "timestamp": self.timestamp,
+            "objects": [
+                {"bbox": box, "confidence": score, "class_id": class_id}
+                for box, score, class_id in zip(self.boxes[:n].tolist(),
+                                                self.scores[:n].tolist(),
+                                                self.classes[:n].tolist())
+            ],
+            "situation": {},
+            "motor_commands": []
+        }
+        if self.error is not None:
+            result["error"] = self.error
+        return result
+
 class AIBrain:
     """Main AI brain for MOTHER robotics system"""
 
@@ -11,6 +42,7 @@ class AIBrain:
         self.object_detector = None
         self.motor_controller = None
         self.is_running = False
+        self._frame_result = None
 
     def start(self):
         """Start the AI brain"""
@@ -26,17 +58,21 @@ class AIBrain:
     def _initialize_components(self):
         """Initialize all AI components"""
         print("Initializing AI components...")
+        # Reused every frame so the camera-rate loop allocates nothing
+        self._frame_result = FrameResult()
 
-    def process_frame(self, frame: np.ndarray) -> Dict[str, Any]:
-        """Process a camera frame"""
+    def process_frame(self, frame: np.ndarray) -> FrameResult:
+        """
+        Process a camera frame. The returned FrameResult is overwritten by the
+        next call; copy it or call to_dict() to keep it. If the brain isn't
+        running, a FrameResult with no detections and error set is returned.
+        """
         if not self.is_running:
-            return {"error": "AI Brain not running"}
+            # Before start() there is no reusable buffer yet
+            return FrameResult(timestamp=time.time(), error="AI Brain not running")
 
-        results = {
-            "timestamp": time.time(),
-            "objects": [],
-            "situation": {},
-            "motor_commands": []
-        }
+        result = self._frame_result
+        result.timestamp = time.time()
+        result.count = 0
 
-        return results
+        return result
@@ -1,12 +1,15 @@
 """
 BERT embedding model for natural language understanding
 """
+import functools
+
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import numpy as np
 
 try:
-    from transformers import BertModel, BertTokenizer
+    from transformers import BertModel, BertTokenizerFast
     TRANSFORMERS_AVAILABLE = True
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
@@ -14,40 +17,56 @@ except ImportError:
 class BERTEmbedding:
     """BERT embedding model for natural language understanding"""
 
-    def __init__(self, model_name='bert-base-uncased'):
+    def __init__(self, model_name='bert-base-uncased', device=None):
         if not TRANSFORMERS_AVAILABLE:
             raise ImportError("transformers library required. Install with: pip install transformers")
 
-        self.tokenizer = BertTokenizer.from_pretrained(model_name)
-        self.model = BertModel.from_pretrained(model_name)
-        self.model.eval()
+        self.device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
+        self.tokenizer = BertTokenizerFast.from_pretrained(model_name)
+        self.model = BertModel.from_pretrained(model_name, torch_dtype=torch.bfloat16)
+        self.model.eval().to(self.device)
 
-    def get_embeddings(self, text):
-        """Get embeddings for text"""
-        inputs = self.tokenizer(text, return_tensors='pt', padding=True, truncation=True)
+        # Repeated single commands skip tokenization and the host-to-device copy
+        self._tokenize_cached = functools.lru_cache(maxsize=1024)(self._tokenize)
+
+    def _tokenize(self, text):
+        """Tokenize a string or a list of strings onto the model device"""
+        return self.tokenizer(text, return_tensors='pt', padding=True, truncation=True).to(self.device)
+
+    def _cls_embeddings(self, text):
+        """CLS embeddings as a float32 tensor on the model device"""
+        if isinstance(text, str):
+            inputs = self._tokenize_cached(text)
+        else:
+            inputs = self._tokenize(list(text))
 
         with torch.no_grad():
             outputs = self.model(**inputs)
-            embeddings = outputs.last_hidden_state[:, 0, :]  # CLS token
+            # Upcast before slicing out the CLS token to avoid bf16 precision loss downstream
+            return outputs.last_hidden_state.float()[:, 0, :]
 
-        return embeddings.numpy()
+    def get_embeddings(self, text):
+        """Get embeddings for text (a string or a list of strings)"""
+        return self._cls_embeddings(text).cpu().numpy()
 
     def semantic_similarity(self, text1, text2):
         """Calculate semantic similarity between two texts"""
-        emb1 = self.get_embeddings(text1)
-        emb2 = self.get_embeddings(text2)
+        # Both texts share one forward pass
+        embs = self.get_embeddings([text1, text2])
+        embs = embs / np.linalg.norm(embs, axis=1, keepdims=True)
 
         # Cosine similarity
-        similarity = np.dot(emb1[0], emb2[0]) / (
-            np.linalg.norm(emb1[0]) * np.linalg.norm(emb2[0])
-        )
+        return float(embs[0] @ embs[1])
 
-        return float(similarity)
+    def similarity_matrix(self, texts):
+        """Pairwise cosine similarities for a list of texts, from one forward pass"""
+        embs = F.normalize(self._cls_embeddings(list(texts)), dim=-1)
+        return (embs @ embs.T).cpu().numpy()
 
     def encode_commands(self, commands):
-        """Encode robot commands"""
-        encoded = {}
-        for command in commands:
-            emb = self.get_embeddings(command)
-            encoded[command] = emb
-        return encoded
+        """Encode robot commands with a single tokenizer call and forward pass"""
+        commands = list(commands)
+        if not commands:
+            return {}
+        embeddings = self.get_embeddings(commands)
+        return {command: embeddings[i:i + 1] for i, command in enumerate(commands)}
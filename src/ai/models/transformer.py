@@ -6,6 +6,8 @@ import torch.nn as nn
 import torch.nn.functional as F
 import math
 
+from .cuda_graph import CUDAGraphRunner
+
 class PositionalEncoding(nn.Module):
     """Positional encoding for transformer"""
 
@@ -17,11 +19,23 @@ class PositionalEncoding(nn.Module):
 
         pe[:, 0::2] = torch.sin(position * div_term)
         pe[:, 1::2] = torch.cos(position * div_term)
-        pe = pe.unsqueeze(0).transpose(0, 1)
-        self.register_buffer('pe', pe)
+        # Contiguous [1, max_len, d_model] to match batch_first inputs
+        pe = pe.unsqueeze(0).contiguous()
+        # Deterministic, so not saved; checkpoints from before the batch_first
+        # layout carry a [max_len, 1, d_model] copy that is dropped on load
+        self.register_buffer('pe', pe, persistent=False)
+        self._register_load_state_dict_pre_hook(self._drop_saved_pe)
+
+    @staticmethod
+    def _drop_saved_pe(state_dict, prefix, *args):
+        state_dict.pop(f'{prefix}pe', None)
 
     def forward(self, x):
-        return x + self.pe[:x.size(0), :]
+        pe = self.pe[:, :x.size(1)]
+        if torch.is_grad_enabled():
+            return x + pe
+        # No autograd graph to protect at inference time
+        return x.add_(pe)
 
 class TransformerModel(nn.Module):
     """Transformer model for robotics decision making"""
@@ -40,9 +54,25 @@ class TransformerModel(nn.Module):
         )
         self.transformer_encoder = nn.TransformerEncoder(encoder_layer, num_layers)
 
-        # Output heads
-        self.action_head = nn.Linear(hidden_dim, 4)  # 4 actions
-        self.value_head = nn.Linear(hidden_dim, 1)   # Value estimate
+        # Output head: 4 action logits + 1 value estimate in a single GEMM
+        self.head = nn.Linear(hidden_dim, 5)
+        self._register_load_state_dict_pre_hook(self._merge_legacy_heads)
+
+        self._graph_runner = CUDAGraphRunner(self)
+
+    def _apply(self, fn, *args, **kwargs):
+        # .half()/.float()/.to() replace parameter storage a captured graph still points at
+        self._graph_runner.reset()
+        return super()._apply(fn, *args, **kwargs)
+
+    @staticmethod
+    def _merge_legacy_heads(state_dict, prefix, *args):
+        """Load checkpoints saved with separate action_head/value_head layers"""
+        for param in ('weight', 'bias'):
+            action = state_dict.pop(f'{prefix}action_head.{param}', None)
+            value = state_dict.pop(f'{prefix}value_head.{param}', None)
+            if action is not None and value is not None:
+                state_dict[f'{prefix}head.{param}'] = torch.cat([action, value])
 
     def forward(self, x, mask=None):
         """Forward pass"""
@@ -58,20 +88,25 @@ class TransformerModel(nn.Module):
         else:
             x = self.transformer_encoder(x)
 
-        # Get outputs
-        actions = self.action_head(x[:, -1, :])  # Last token
-        value = self.value_head(x[:, -1, :])
+        # Last token, or the last non-padded token of each sequence
+        if mask is not None:
+            last_idx = (~mask).sum(dim=1) - 1
+            last = x[torch.arange(x.size(0), device=x.device), last_idx]
+        else:
+            last = x[:, -1]
 
-        return actions, value
+        out = self.head(last)
+        return out[:, :4], out[:, 4:5]
 
     def predict_action(self, sensor_data):
         """Predict action from sensor data"""
         with torch.no_grad():
             # Convert sensor data to tensor
-            x = torch.tensor(sensor_data, dtype=torch.float32).unsqueeze(0)
+            device = self.input_projection.weight.device
+            x = torch.tensor(sensor_data, dtype=torch.float32, device=device).unsqueeze(0)
 
-            # Get prediction
-            actions, value = self.forward(x)
+            # Get prediction (CUDA graph replay on GPU, eager on CPU)
+            actions, value = self._graph_runner(x)
 
             # Convert to probabilities
             action_probs = F.softmax(actions, dim=-1)
@@ -1,17 +1,46 @@
 import os
 import json
 import base64
+import gzip
+import hashlib
 import io
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlsplit
 import pandas as pd
+import orjson
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+import plotly.io as pio
 
 import dash
 from dash import html, dcc, Input, Output, State, callback_context
 import dash_bootstrap_components as dbc
 from dash import dash_table
-from flask import Flask, jsonify
+from flask import Flask, Response
+
+# Dash serializes callback outputs (stores, tables, figures) through plotly's JSON layer
+pio.json.config.default_engine = "orjson"
 
 # ----------------------------
 # Configuration
@@ -25,24 +54,50 @@ ENTERPRISE_API_KEY = env("ENTERPRISE_API_KEY")  # x-api-key value
 MOTHER_LLM_URL = env("MOTHER_LLM_URL")  # optional direct endpoint (bypass enterprise)
 MOTHER_REASONING_URL = env("MOTHER_REASONING_URL")  # optional direct endpoint
 MOTHER_API_TIMEOUT_S = int(env("MOTHER_API_TIMEOUT_S", "30"))
+MOTHER_MAX_CONCURRENT = int(env("MOTHER_MAX_CONCURRENT", "8"))  # in-flight backend calls per process
+CONTEXT_PACK_MAX_TOKENS = int(env("CONTEXT_PACK_MAX_TOKENS", "8000"))  # cap on the pack sent with prompts
+MOTHER_GZIP_REQUESTS = env("MOTHER_GZIP_REQUESTS", "0").lower() in ("1", "true", "yes")  # gzip large LLM/reasoning bodies
 
 DIGITAL_TWIN_URL = env("DIGITAL_TWIN_URL")  # optional: backend endpoint for sim jobs
 CAD_RENDER_URL = env("CAD_RENDER_URL")  # optional: backend endpoint to render/convert CAD (e.g. scad->stl)
 
 APP_TITLE = "MOTHER Robotics — Digital Twin & Planning"
 
+# Resolved backend routes: a direct endpoint wins, else the enterprise API with its key
+_ENTERPRISE_CONFIGURED = bool(ENTERPRISE_API_URL and ENTERPRISE_API_KEY)
+_ENTERPRISE_HEADERS = {"x-api-key": ENTERPRISE_API_KEY} if _ENTERPRISE_CONFIGURED else None
+_LLM_URL = MOTHER_LLM_URL or (ENTERPRISE_API_URL.rstrip("/") + "/mother/llm" if _ENTERPRISE_CONFIGURED else "")
+_LLM_HEADERS = None if MOTHER_LLM_URL else _ENTERPRISE_HEADERS
+_REASONING_URL = MOTHER_REASONING_URL or (ENTERPRISE_API_URL.rstrip("/") + "/mother/reasoning" if _ENTERPRISE_CONFIGURED else "")
+_REASONING_HEADERS = None if MOTHER_REASONING_URL else _ENTERPRISE_HEADERS
+
 # ----------------------------
 # Server + Dash
 # ----------------------------
 server = Flask(__name__)
 
+_last_ts = (0, "")
+
+def _iso_now() -> str:
+    """Current UTC time as ISO-8601 with a Z suffix, second resolution; formatted once per second."""
+    global _last_ts
+    now = int(time.time())
+    sec, text = _last_ts
+    if now != sec:
+        text = datetime.utcfromtimestamp(now).isoformat() + "Z"
+        _last_ts = (now, text)
+    return text
+
+def _json(payload: dict) -> Response:
+    return Response(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY), mimetype="application/json")
+
 @server.get("/health")
 def health():
-    return jsonify({"status": "healthy", "service": "mother-robotics-dashboard", "time": datetime.utcnow().isoformat() + "Z"})
+    return _json({"status": "healthy", "service": "mother-robotics-dashboard", "time": _iso_now()})
 
 @server.get("/api/status")
 def status():
-    return jsonify({
+    return _json({
         "status": "running",
         "version": "2.0.0",
         "enterprise_api_configured": bool(ENTERPRISE_API_URL and ENTERPRISE_API_KEY),
@@ -52,51 +107,256 @@ def status():
         "cad_render_configured": bool(CAD_RENDER_URL),
     })
 
-def _post_json(url: str, payload: dict, headers: dict | None = None) -> dict:
+# Upstream replies that mean "not processed, try again later"
+RETRYABLE_STATUSES = (429, 502, 503, 504)
+
+def _make_session() -> requests.Session:
+    # Keep-alive pool shared by all backend calls, so repeat calls skip the TCP/TLS handshake.
+    # POSTs are retried with exponential backoff (honoring Retry-After) on connection
+    # failures and RETRYABLE_STATUSES; never after a read error, where the backend may
+    # already have acted on the request.
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            connect=2,
+            read=0,
+            status=3,
+            status_forcelist=RETRYABLE_STATUSES,
+            allowed_methods=frozenset({"POST"}),
+            backoff_factor=0.5,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+SESSION = _make_session()
+_outbound_slots = threading.BoundedSemaphore(MOTHER_MAX_CONCURRENT)
+
+GZIP_MIN_BYTES = 4096
+# Servers that don't inflate request bodies reject them as unsupported (415) or as
+# unparseable JSON (400, or 422 from FastAPI/Starlette validation)
+GZIP_REJECTED_STATUSES = {400, 415, 422}
+_no_gzip_hosts: set = set()  # hosts that rejected a gzip body
+
+def _post_json(url: str, payload: dict, headers: dict | None = None, compress: bool = False) -> dict:
     h = {"Content-Type": "application/json"}
     if headers:
         h.update(headers)
-    r = requests.post(url, json=payload, headers=h, timeout=MOTHER_API_TIMEOUT_S)
-    r.raise_for_status()
-    return r.json() if r.content else {}
+    data = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    # Context packs run to tens of KB of prose; gzip them on the way up when the
+    # backend is known to accept it (opt-in, MOTHER_GZIP_REQUESTS)
+    host = urlsplit(url).netloc
+    if compress and len(data) > GZIP_MIN_BYTES and host not in _no_gzip_hosts:
+        try:
+            return _send_json(url, gzip.compress(data, compresslevel=3), {**h, "Content-Encoding": "gzip"})
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in GZIP_REJECTED_STATUSES:
+                raise
+            _no_gzip_hosts.add(host)
+    return _send_json(url, data, h)
+
+def _send_json(url: str, body: bytes, headers: dict) -> dict:
+    # Stream the reply into one buffer and parse it in place; the connection goes back
+    # to the pool as soon as the last chunk is read
+    with _outbound_slots, SESSION.post(url, data=body, headers=headers, timeout=MOTHER_API_TIMEOUT_S, stream=True) as r:
+        r.raise_for_status()
+        buf = bytearray()
+        for chunk in r.iter_content(chunk_size=65536):
+            buf.extend(chunk)
+    return orjson.loads(buf) if buf else {}
+
+KNOWN_CONTEXT_HASHES_SIZE = 256
+_known_context_hashes: "OrderedDict[str, bool]" = OrderedDict()
+_known_context_lock = threading.Lock()
+
+def _context_hash_known(context_hash: str) -> bool:
+    with _known_context_lock:
+        if context_hash in _known_context_hashes:
+            _known_context_hashes.move_to_end(context_hash)
+            return True
+        return False
+
+def _remember_context_hash(context_hash: str, known: bool = True) -> None:
+    with _known_context_lock:
+        if not known:
+            _known_context_hashes.pop(context_hash, None)
+            return
+        _known_context_hashes[context_hash] = True
+        if len(_known_context_hashes) > KNOWN_CONTEXT_HASHES_SIZE:
+            _known_context_hashes.popitem(last=False)
+
+def _post_llm(url: str, payload: dict, headers: dict | None = None) -> dict:
+    """POST an LLM request, sending the context pack body only when the backend may not have it.
+
+    Every request carries contextHash. The body is skipped only for hashes the backend
+    has confirmed with {"contextCached": true}; a 409 or {"cache_miss": true} reply
+    triggers one resend with the full context. Backends unaware of the protocol
+    never confirm, so they always receive the context.
+    """
+    context_pack = payload.get("context")
+    if not context_pack:
+        return _post_json(url, payload, headers, compress=MOTHER_GZIP_REQUESTS)
+
+    context_hash = hashlib.blake2b(context_pack.encode("utf-8"), digest_size=16).hexdigest()
+    payload = {**payload, "contextHash": context_hash}
+
+    if _context_hash_known(context_hash):
+        try:
+            res = _post_json(url, {**payload, "context": None}, headers)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 409:
+                raise
+            res = {"cache_miss": True}
+        if not (isinstance(res, dict) and res.get("cache_miss")):
+            return res
+        _remember_context_hash(context_hash, known=False)
+
+    res = _post_json(url, payload, headers, compress=MOTHER_GZIP_REQUESTS)
+    if isinstance(res, dict) and res.get("contextCached"):
+        _remember_context_hash(context_hash)
+    return res
+
+_inflight: dict = {}  # request key -> Future shared by identical concurrent calls
+_inflight_lock = threading.Lock()
+
+def _single_flight(key: bytes, fn, *args):
+    """Run fn(*args) once for concurrent callers with the same key; the rest wait for its result."""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        result = fn(*args)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+def _request_key(*parts) -> bytes:
+    return hashlib.blake2b(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
 
 def call_mother_llm(prompt: str, context_pack: str | None = None, max_tokens: int = 1200) -> dict:
-    if MOTHER_LLM_URL:
-        return _post_json(MOTHER_LLM_URL, {"prompt": prompt, "context": context_pack, "maxTokens": max_tokens})
-    if ENTERPRISE_API_URL and ENTERPRISE_API_KEY:
-        return _post_json(
-            ENTERPRISE_API_URL.rstrip("/") + "/mother/llm",
-            {"prompt": prompt, "context": context_pack, "maxTokens": max_tokens},
-            headers={"x-api-key": ENTERPRISE_API_KEY},
-        )
-    return {"error": "No MOTHER LLM endpoint configured. Set MOTHER_LLM_URL or ENTERPRISE_API_URL + ENTERPRISE_API_KEY."}
+    if not _LLM_URL:
+        return {"error": "No MOTHER LLM endpoint configured. Set MOTHER_LLM_URL or ENTERPRISE_API_URL + ENTERPRISE_API_KEY."}
+    payload = {"prompt": prompt, "context": context_pack, "maxTokens": max_tokens}
+    # A double click or two users sending the same prompt share one upstream request
+    return _single_flight(_request_key("llm", payload), _post_llm, _LLM_URL, payload, _LLM_HEADERS)
 
 def call_mother_reasoning(task: str, state: dict | None = None) -> dict:
-    if MOTHER_REASONING_URL:
-        return _post_json(MOTHER_REASONING_URL, {"task": task, "state": state or {}})
-    if ENTERPRISE_API_URL and ENTERPRISE_API_KEY:
-        return _post_json(
-            ENTERPRISE_API_URL.rstrip("/") + "/mother/reasoning",
-            {"task": task, "state": state or {}},
-            headers={"x-api-key": ENTERPRISE_API_KEY},
-        )
-    return {"error": "No MOTHER Reasoning endpoint configured. Set MOTHER_REASONING_URL or ENTERPRISE_API_URL + ENTERPRISE_API_KEY."}
+    if not _REASONING_URL:
+        return {"error": "No MOTHER Reasoning endpoint configured. Set MOTHER_REASONING_URL or ENTERPRISE_API_URL + ENTERPRISE_API_KEY."}
+    payload = {"task": task, "state": state or {}}
+    return _single_flight(_request_key("reasoning", payload), _post_json, _REASONING_URL, payload, _REASONING_HEADERS, MOTHER_GZIP_REQUESTS)
+
+def call_mother_batch(calls: list) -> list:
+    """Run several MOTHER calls concurrently over the pooled session.
+
+    calls: [(call_mother_llm, {"prompt": ...}), (call_mother_reasoning, {"task": ...}), ...]
+    Returns the responses in the same order.
+    """
+    if not calls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(len(calls), MOTHER_MAX_CONCURRENT)) as ex:
+        futures = [ex.submit(fn, **kwargs) for fn, kwargs in calls]
+        return [f.result() for f in futures]
 
 def summarize_df(df: pd.DataFrame, max_rows: int = 5) -> str:
     lines = []
     lines.append(f"shape: {df.shape}")
     lines.append("columns: " + ", ".join([f"{c}({str(df[c].dtype)})" for c in df.columns[:80]]))
-    head = df.head(max_rows).to_dict(orient="records")
-    lines.append("head: " + json.dumps(head, ensure_ascii=False)[:2000])
+    # pandas writes the JSON straight from its columns, no intermediate record dicts
+    lines.append("head: " + df.head(max_rows).to_json(orient="records", force_ascii=False)[:2000])
     return "\n".join(lines)
 
+# Uploads are stored column-wise, one list per field, so the session store
+# doesn't repeat every key for every upload
+UPLOAD_FIELDS = ("id", "name", "kind", "summary", "ts")
+
+def _upload_columns(uploads) -> dict:
+    """Upload columns from the store, converting the per-upload list of older sessions."""
+    if isinstance(uploads, list):
+        return {f: [u.get(f) for u in uploads] for f in UPLOAD_FIELDS}
+    uploads = uploads or {}
+    return {f: list(uploads.get(f) or []) for f in UPLOAD_FIELDS}
+
+CONTEXT_PACK_CACHE_SIZE = 64
+_context_pack_cache: "OrderedDict[str, str]" = OrderedDict()
+_context_pack_lock = threading.Lock()
+
 def build_context_pack(workspace: dict) -> str:
-    """Create a compact text bundle of the current dashboard workspace."""
-    parts = []
-    parts.append("# MOTHER Robotics Dashboard Context Pack")
-    parts.append(f"generated_at_utc: {datetime.utcnow().isoformat()}Z")
+    """Create a compact text bundle of the current dashboard workspace.
+
+    Packs are memoized per workspace content, so generated_at_utc is the time the
+    pack was first assembled and an unchanged workspace yields a byte-identical
+    pack (and context hash) across calls.
+    """
     if not workspace:
-        return "\n".join(parts) + "\n(no workspace data)\n"
+        return _context_pack_header() + "\n(no workspace data)\n"
+
+    # Sorted keys make the hash independent of dict ordering
+    key = hashlib.blake2b(orjson.dumps(workspace, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    with _context_pack_lock:
+        pack = _context_pack_cache.get(key)
+        if pack is not None:
+            _context_pack_cache.move_to_end(key)
+    if pack is None:
+        pack = _fit_tokens(_context_pack_header() + _context_pack_body(workspace), CONTEXT_PACK_MAX_TOKENS)
+        with _context_pack_lock:
+            _context_pack_cache[key] = pack
+            if len(_context_pack_cache) > CONTEXT_PACK_CACHE_SIZE:
+                _context_pack_cache.popitem(last=False)
+    return pack
+
+TRUNCATION_MARK = "\n...[truncated]...\n"
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    # Cached either way: tiktoken retries the BPE download on every failed load
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None  # BPE file not cached locally and not downloadable
+
+def _fit_tokens(text: str, budget: int) -> str:
+    """Cap text at about budget tokens, keeping its head (60%) and tail (30%) and dropping the middle.
+
+    Counts cl100k_base tokens when tiktoken is available, else assumes ~4 characters per token.
+    """
+    enc = _token_encoding()
+    if enc is not None:
+        tokens = enc.encode(text, disallowed_special=())
+        if len(tokens) <= budget:
+            return text
+        return enc.decode(tokens[:budget * 6 // 10]) + TRUNCATION_MARK + enc.decode(tokens[-(budget * 3 // 10):])
+
+    limit = budget * 4
+    if len(text) <= limit:
+        return text
+    return text[:limit * 6 // 10] + TRUNCATION_MARK + text[-(limit * 3 // 10):]
+
+def _context_pack_header() -> str:
+    return "# MOTHER Robotics Dashboard Context Pack\n" + f"generated_at_utc: {_iso_now()}"
+
+def _context_pack_body(workspace: dict) -> str:
+    parts = [""]
     notes = workspace.get("notes", "")
     if notes:
         parts.append("\n## Notes\n" + notes[:6000])
@@ -109,13 +369,13 @@ def build_context_pack(workspace: dict) -> str:
     cad = workspace.get("cad_code", "")
     if cad:
         parts.append("\n## CAD Code\n" + cad[:12000])
-    uploads = workspace.get("uploads", [])
-    if uploads:
+    uploads = _upload_columns(workspace.get("uploads"))
+    if uploads["id"]:
         parts.append("\n## Uploaded Data\n")
-        for u in uploads[:10]:
-            parts.append(f"- {u.get('name')} ({u.get('kind')})")
-            if u.get("summary"):
-                parts.append("  " + u["summary"].replace("\n", "\n  ")[:4000])
+        for name, kind, summary in zip(uploads["name"][:10], uploads["kind"][:10], uploads["summary"][:10]):
+            parts.append(f"- {name} ({kind})")
+            if summary:
+                parts.append("  " + summary.replace("\n", "\n  ")[:4000])
     return "\n".join(parts)
 
 # ----------------------------
@@ -124,6 +384,15 @@ def build_context_pack(workspace: dict) -> str:
 def pill(text, color="secondary"):
     return dbc.Badge(text, color=color, className="me-1", pill=True)
 
+def status_chips():
+    # Built from env config that is fixed for the process lifetime, so rendered once rather than polled
+    chips = []
+    chips.append(pill("LLM" if (MOTHER_LLM_URL or (ENTERPRISE_API_URL and ENTERPRISE_API_KEY)) else "LLM: not set", "success" if (MOTHER_LLM_URL or (ENTERPRISE_API_URL and ENTERPRISE_API_KEY)) else "secondary"))
+    chips.append(pill("Reasoning" if (MOTHER_REASONING_URL or (ENTERPRISE_API_URL and ENTERPRISE_API_KEY)) else "Reasoning: not set", "success" if (MOTHER_REASONING_URL or (ENTERPRISE_API_URL and ENTERPRISE_API_KEY)) else "secondary"))
+    chips.append(pill("CAD render" if CAD_RENDER_URL else "CAD render: off", "warning" if CAD_RENDER_URL else "secondary"))
+    chips.append(pill("Digital Twin" if DIGITAL_TWIN_URL else "Digital Twin: off", "warning" if DIGITAL_TWIN_URL else "secondary"))
+    return html.Div(chips)
+
 def sidebar():
     return html.Div(
         [
@@ -168,7 +437,7 @@ def sidebar():
             html.Div(
                 [
                     html.Div("Status", className="text-uppercase text-muted", style={"fontSize": ".8rem"}),
-                    html.Div(id="status-chips", className="mt-2"),
+                    html.Div(status_chips(), id="status-chips", className="mt-2"),
                 ],
                 className="p-3"
             ),
@@ -522,8 +791,13 @@ app = dash.Dash(
 app.layout = dbc.Container(
     [
         dcc.Location(id="url", refresh=False),
-        dcc.Store(id="ws-store", storage_type="session", data={"uploads": []}),
+        dcc.Store(id="ws-store", storage_type="session", data={"uploads": _upload_columns(None)}),
+        # Preview rows live in the browser's IndexedDB (assets/store_cache.js); these hold
+        # only the latest upload batch and the preview currently shown
+        dcc.Store(id="ws-new-previews"),
+        dcc.Store(id="ws-preview"),
         dcc.Store(id="last-dt-result", storage_type="session"),
+        dcc.Store(id="rs-text-store"),
         dbc.Row(
             [
                 dbc.Col(sidebar(), width=3),
@@ -531,7 +805,6 @@ app.layout = dbc.Container(
             ],
             className="g-0",
         ),
-        dcc.Interval(id="status-tick", interval=4000, n_intervals=0),
     ],
     fluid=True,
     style={"maxWidth": "100%"},
@@ -540,35 +813,21 @@ app.layout = dbc.Container(
 # ----------------------------
 # Routing
 # ----------------------------
+# Page layouts only depend on process-wide env config, so build each one once
+PAGES = {
+    "/": overview_page(),
+    "/workspace": workspace_page(),
+    "/assistant": assistant_page(),
+    "/reasoning": reasoning_page(),
+    "/cad": cad_page(),
+    "/digital-twin": digital_twin_page(),
+    "/settings": settings_page(),
+}
+NOT_FOUND_PAGE = page_shell([dbc.Alert("Page not found", color="warning")])
+
 @app.callback(Output("page-content", "children"), Input("url", "pathname"))
 def route(pathname):
-    if pathname == "/":
-        return overview_page()
-    if pathname == "/workspace":
-        return workspace_page()
-    if pathname == "/assistant":
-        return assistant_page()
-    if pathname == "/reasoning":
-        return reasoning_page()
-    if pathname == "/cad":
-        return cad_page()
-    if pathname == "/digital-twin":
-        return digital_twin_page()
-    if pathname == "/settings":
-        return settings_page()
-    return page_shell([dbc.Alert("Page not found", color="warning")])
-
-# ----------------------------
-# Status chips
-# ----------------------------
-@app.callback(Output("status-chips", "children"), Input("status-tick", "n_intervals"))
-def status_chips(_):
-    chips = []
-    chips.append(pill("LLM" if (MOTHER_LLM_URL or (ENTERPRISE_API_URL and ENTERPRISE_API_KEY)) else "LLM: not set", "success" if (MOTHER_LLM_URL or (ENTERPRISE_API_URL and ENTERPRISE_API_KEY)) else "secondary"))
-    chips.append(pill("Reasoning" if (MOTHER_REASONING_URL or (ENTERPRISE_API_URL and ENTERPRISE_API_KEY)) else "Reasoning: not set", "success" if (MOTHER_REASONING_URL or (ENTERPRISE_API_URL and ENTERPRISE_API_KEY)) else "secondary"))
-    chips.append(pill("CAD render" if CAD_RENDER_URL else "CAD render: off", "warning" if CAD_RENDER_URL else "secondary"))
-    chips.append(pill("Digital Twin" if DIGITAL_TWIN_URL else "Digital Twin: off", "warning" if DIGITAL_TWIN_URL else "secondary"))
-    return html.Div(chips)
+    return PAGES.get(pathname, NOT_FOUND_PAGE)
 
 # ----------------------------
 # Workspace: upload + save + preview
@@ -577,9 +836,78 @@ def _decode_upload(contents: str) -> bytes:
     content_type, content_string = contents.split(',')
     return base64.b64decode(content_string)
 
+def _read_csv(raw: bytes) -> pd.DataFrame:
+    if PYARROW_AVAILABLE:
+        # Multi-threaded Arrow tokenizer; numpy-backed result keeps previews JSON-serializable
+        try:
+            return pd.read_csv(io.BytesIO(raw), engine="pyarrow")
+        except (pyarrow.ArrowInvalid, ValueError):
+            pass  # e.g. ragged rows the C parser tolerates
+    return pd.read_csv(io.BytesIO(raw))
+
+def _arrow_preview(df: pd.DataFrame) -> dict:
+    """Columnar Arrow IPC stream, base64-encoded for the session store."""
+    table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return {"arrow_ipc": base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")}
+
+def _preview_records(preview) -> list:
+    """Rows of a CSV preview, whether stored as Arrow IPC or (older sessions) records."""
+    if isinstance(preview, dict) and "arrow_ipc" in preview:
+        reader = pyarrow.ipc.open_stream(base64.b64decode(preview["arrow_ipc"]))
+        return reader.read_all().to_pandas().to_dict(orient="records")
+    return preview if isinstance(preview, list) else []
+
+PREVIEW_ROWS = 25
+PREVIEW_CHARS = 2000
+
+def _process_upload(contents: str, name: str, ts: str):
+    """Parse one uploaded file into (workspace upload entry, preview rows/text, status alert)."""
+    try:
+        raw = _decode_upload(contents)
+        kind = "txt"
+        summary = ""
+        preview = ""
+        if name.lower().endswith(".csv"):
+            kind = "csv"
+            df = _read_csv(raw)
+            summary = summarize_df(df)
+            head = df.head(PREVIEW_ROWS)
+            preview = _arrow_preview(head) if PYARROW_AVAILABLE else head.to_dict(orient="records")
+        elif name.lower().endswith(".json"):
+            kind = "json"
+            try:
+                # Parses straight from the bytes, no intermediate str
+                obj = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                obj = json.loads(raw.decode("utf-8", errors="ignore"))
+            # Only the first PREVIEW_ROWS items are stored, not the whole document
+            preview = obj[:PREVIEW_ROWS] if isinstance(obj, list) else [obj]
+            summary = "json keys: " + ", ".join(list(obj.keys())[:60]) if isinstance(obj, dict) else f"json list len: {len(obj)}"
+        else:
+            kind = "txt"
+            # Decode just the preview slice; for ASCII the char count is the byte count
+            preview = raw[:PREVIEW_CHARS * 4].decode("utf-8", errors="ignore")[:PREVIEW_CHARS]
+            n_chars = len(raw) if raw.isascii() else len(raw.decode("utf-8", errors="ignore"))
+            summary = f"chars: {n_chars}"
+
+        upload = {
+            "id": uuid.uuid4().hex,
+            "name": name,
+            "kind": kind,
+            "summary": summary,
+            "ts": ts,
+        }
+        return upload, preview, dbc.Alert(f"Loaded {name}", color="success", dismissable=True)
+    except Exception as e:
+        return None, None, dbc.Alert(f"Failed to read {name}: {e}", color="danger", dismissable=True)
+
 @app.callback(
     Output("ws-upload-status", "children"),
     Output("ws-store", "data"),
+    Output("ws-new-previews", "data"),
     Input("ws-upload", "contents"),
     State("ws-upload", "filename"),
     State("ws-store", "data"),
@@ -587,77 +915,104 @@ def _decode_upload(contents: str) -> bytes:
 )
 def handle_upload(list_of_contents, list_of_names, store):
     if not list_of_contents:
-        return dash.no_update, store
-    store = store or {"uploads": []}
-    uploads = store.get("uploads", [])
+        return dash.no_update, store, dash.no_update
+    store = store or {}
+    uploads = _upload_columns(store.get("uploads"))
+    items = {}
     messages = []
 
-    for contents, name in zip(list_of_contents, list_of_names):
-        try:
-            raw = _decode_upload(contents)
-            kind = "txt"
-            summary = ""
-            preview = ""
-            if name.lower().endswith(".csv"):
-                kind = "csv"
-                df = pd.read_csv(io.BytesIO(raw))
-                summary = summarize_df(df)
-                preview = df.head(25).to_dict(orient="records")
-            elif name.lower().endswith(".json"):
-                kind = "json"
-                obj = json.loads(raw.decode("utf-8", errors="ignore"))
-                preview = obj if isinstance(obj, list) else [obj]
-                summary = "json keys: " + ", ".join(list(obj.keys())[:60]) if isinstance(obj, dict) else f"json list len: {len(obj)}"
-            else:
-                kind = "txt"
-                txt = raw.decode("utf-8", errors="ignore")
-                preview = txt[:2000]
-                summary = f"chars: {len(txt)}"
-
-            uploads.append({
-                "name": name,
-                "kind": kind,
-                "summary": summary,
-                "preview": preview,
-                "ts": datetime.utcnow().isoformat() + "Z",
-            })
-            messages.append(dbc.Alert(f"Loaded {name}", color="success", dismissable=True))
-        except Exception as e:
-            messages.append(dbc.Alert(f"Failed to read {name}: {e}", color="danger", dismissable=True))
+    # Decode and parse files concurrently; results keep upload order and share one timestamp
+    ts = [_iso_now()] * len(list_of_contents)
+    with ThreadPoolExecutor(max_workers=min(8, len(list_of_contents))) as ex:
+        results = list(ex.map(_process_upload, list_of_contents, list_of_names, ts))
+
+    for upload, preview, message in results:
+        if upload is not None:
+            for f in UPLOAD_FIELDS:
+                uploads[f].append(upload[f])
+            items[upload["id"]] = {"kind": upload["kind"], "preview": preview}
+        messages.append(message)
 
+    # Only this batch's previews are sent back; the browser caches them in IndexedDB
     store["uploads"] = uploads
-    return html.Div(messages), store
+    return html.Div(messages), store, {"items": items}
 
-@app.callback(
+# Rendered in the browser: the list only needs upload metadata already in the session
+# store, and ws-store changes on every save, so this avoids a server round trip each time
+app.clientside_callback(
+    """
+    function(store) {
+        var uploads = (store && store.uploads) || {};
+        var names = uploads.name || [];
+        if (!names.length) {
+            return {namespace: "dash_bootstrap_components", type: "Alert",
+                    props: {children: "No uploads yet. Add CSV/JSON/TXT to explore.", color: "secondary"}};
+        }
+        var items = [];
+        for (var i = names.length - 1; i >= Math.max(0, names.length - 10); i--) {
+            items.push({namespace: "dash_bootstrap_components", type: "ListGroupItem", props: {children: [
+                {namespace: "dash_html_components", type: "Div", props: {children: [
+                    {namespace: "dash_html_components", type: "Span", props: {children: names[i], className: "fw-semibold"}},
+                    {namespace: "dash_html_components", type: "Span", props: {children: "  \u00b7  " + uploads.kind[i], className: "text-muted"}}
+                ]}},
+                {namespace: "dash_html_components", type: "Div",
+                 props: {children: uploads.summary[i] || "", className: "text-muted", style: {fontSize: ".85rem"}}}
+            ]}});
+        }
+        return {namespace: "dash_bootstrap_components", type: "ListGroup", props: {children: items, flush: true}};
+    }
+    """,
     Output("ws-data-list", "children"),
-    Output("ws-data-preview", "children"),
     Input("ws-store", "data"),
 )
-def ws_preview(store):
-    store = store or {}
-    uploads = store.get("uploads", [])
-    if not uploads:
-        return dbc.Alert("No uploads yet. Add CSV/JSON/TXT to explore.", color="secondary"), html.Div()
-
-    items = []
-    for i, u in enumerate(reversed(uploads[-10:])):
-        items.append(
-            dbc.ListGroupItem(
-                [
-                    html.Div([html.Span(u.get("name"), className="fw-semibold"), html.Span(f"  ·  {u.get('kind')}", className="text-muted")]),
-                    html.Div(u.get("summary", ""), className="text-muted", style={"fontSize": ".85rem"}),
-                ]
-            )
-        )
-    list_group = dbc.ListGroup(items, flush=True)
 
-    latest = uploads[-1]
-    if latest.get("kind") == "csv" and isinstance(latest.get("preview"), list):
+# Caches a new upload batch and picks the latest upload's preview, reading IndexedDB
+# only when the shown preview is stale (e.g. after a reload), so saves don't refetch it
+app.clientside_callback(
+    """
+    function(batch, store, shown) {
+        var cache = window.storeCache;
+        var ids = (store && store.uploads && store.uploads.id) || [];
+        var latest = ids.length ? ids[ids.length - 1] : null;
+        var withId = function(item) {
+            return item ? Object.assign({id: latest}, item) : dash_clientside.no_update;
+        };
+        var fresh = dash_clientside.callback_context.triggered.some(function(t) {
+            return t.prop_id === "ws-new-previews.data";
+        });
+
+        if (fresh && batch && batch.items) {
+            var keep = ids.slice(-10);
+            var saved = cache ? cache.putPreviews(batch.items, keep) : Promise.resolve();
+            return saved.then(function() { return withId(batch.items[latest]); });
+        }
+        if (!latest || !cache || (shown && shown.id === latest)) {
+            return dash_clientside.no_update;
+        }
+        return cache.getPreview(latest).then(withId);
+    }
+    """,
+    Output("ws-preview", "data"),
+    Input("ws-new-previews", "data"),
+    Input("ws-store", "data"),
+    State("ws-preview", "data"),
+)
+
+@app.callback(
+    Output("ws-data-preview", "children"),
+    Input("ws-preview", "data"),
+)
+def ws_preview(latest):
+    if not latest:
+        return html.Div()
+
+    if latest.get("kind") == "csv" and isinstance(latest.get("preview"), (list, dict)):
+        rows = _preview_records(latest["preview"])
         cols = []
-        if latest["preview"]:
-            cols = [{"name": k, "id": k} for k in latest["preview"][0].keys()]
+        if rows:
+            cols = [{"name": k, "id": k} for k in rows[0].keys()]
         table = dash_table.DataTable(
-            data=latest["preview"],
+            data=rows,
             columns=cols,
             page_size=10,
             style_table={"overflowX": "auto"},
@@ -668,9 +1023,20 @@ def ws_preview(store):
     else:
         preview = card("Latest preview", monospace_block(str(latest.get("preview", ""))[:4000]))
 
-    return list_group, preview
+    return preview
 
-@app.callback(
+# Saving only copies editor values into the session store, so it never leaves the browser
+app.clientside_callback(
+    """
+    function(_n, store, notes, plan, code, cadCode) {
+        return Object.assign({uploads: {}}, store, {
+            notes: notes || "",
+            plan: plan || "",
+            code: code || "",
+            cad_code: cadCode || ""
+        });
+    }
+    """,
     Output("ws-store", "data", allow_duplicate=True),
     Input("ws-save", "n_clicks"),
     State("ws-store", "data"),
@@ -680,13 +1046,6 @@ def ws_preview(store):
     State("ws-cad-code", "value"),
     prevent_initial_call=True,
 )
-def ws_save(_n, store, notes, plan, code, cad_code):
-    store = store or {"uploads": []}
-    store["notes"] = notes or ""
-    store["plan"] = plan or ""
-    store["code"] = code or ""
-    store["cad_code"] = cad_code or ""
-    return store
 
 @app.callback(
     Output("ws-download", "data"),
@@ -710,32 +1069,28 @@ def ws_download(n_code, n_cad, code, cad_code):
 @app.callback(
     Output("url", "pathname", allow_duplicate=True),
     Output("ws-plan", "value", allow_duplicate=True),
-    Input("qa-generate-plan", "n_clicks"),
-    State("ws-store", "data"),
-    prevent_initial_call=True,
-)
-def qa_generate_plan(_n, store):
-    store = store or {}
-    ctx = build_context_pack(store)
-    task = "Generate a robotics development plan with milestones, risks, test plan, and integration steps. Use the context pack."
-    res = call_mother_reasoning(task, state={"context_pack": ctx})
-    text = json.dumps(res, indent=2) if isinstance(res, (dict, list)) else str(res)
-    return "/workspace", text
-
-@app.callback(
-    Output("url", "pathname", allow_duplicate=True),
     Output("ws-code", "value", allow_duplicate=True),
+    Input("qa-generate-plan", "n_clicks"),
     Input("qa-draft-ros2", "n_clicks"),
     State("ws-store", "data"),
     prevent_initial_call=True,
 )
-def qa_ros2(_n, store):
+def quick_actions(n_plan, n_ros2, store):
+    # One round trip navigates to the workspace and fills whichever artifact the action produced
+    trig = callback_context.triggered[0]["prop_id"].split(".")[0]
     store = store or {}
     ctx = build_context_pack(store)
+
+    if trig == "qa-generate-plan":
+        task = "Generate a robotics development plan with milestones, risks, test plan, and integration steps. Use the context pack."
+        res = call_mother_reasoning(task, state={"context_pack": ctx})
+        text = json.dumps(res, indent=2) if isinstance(res, (dict, list)) else str(res)
+        return "/workspace", text, dash.no_update
+
     prompt = "Draft a ROS2 (Humble) Python node implementing a basic planner interface with clear TODOs for sensor input and actuator output. Include unit-test scaffolding."
     res = call_mother_llm(prompt, context_pack=ctx, max_tokens=1600)
     content = res.get("content") or res.get("response") or res.get("text") or json.dumps(res, indent=2)
-    return "/workspace", content
+    return "/workspace", dash.no_update, content
 
 # ----------------------------
 # LLM Page callbacks
@@ -779,6 +1134,7 @@ def llm_actions(n_send, n_chk, n_ros, n_safe, prompt, max_tokens, use_ctx, store
 # ----------------------------
 @app.callback(
     Output("rs-output", "children"),
+    Output("rs-text-store", "data"),
     Input("rs-run", "n_clicks"),
     Input("rs-tests", "n_clicks"),
     Input("rs-failure", "n_clicks"),
@@ -811,26 +1167,25 @@ def reasoning_actions(n_run, n_tests, n_fail, task, state_txt, store):
             state = {**state, "context_pack": ctx}
 
     if not task:
-        return dbc.Alert("Task required.", color="warning")
+        return dbc.Alert("Task required.", color="warning"), dash.no_update
     res = call_mother_reasoning(task, state=state)
     if isinstance(res, dict) and res.get("error"):
-        return dbc.Alert(res["error"], color="danger")
-    return monospace_block(json.dumps(res, indent=2) if isinstance(res, (dict, list)) else str(res))
+        return dbc.Alert(res["error"], color="danger"), dash.no_update
+    text = json.dumps(res, indent=2) if isinstance(res, (dict, list)) else str(res)
+    return monospace_block(text), text
 
-@app.callback(
+# The raw result text is kept in rs-text-store, so saving it never sends the output component tree
+app.clientside_callback(
+    """
+    function(_n, text) {
+        return text || "";
+    }
+    """,
     Output("ws-plan", "value", allow_duplicate=True),
     Input("rs-save-to-plan", "n_clicks"),
-    State("rs-output", "children"),
+    State("rs-text-store", "data"),
     prevent_initial_call=True,
 )
-def rs_save_to_plan(_n, rs_out):
-    # rs_out is a component; try to extract text from Pre
-    try:
-        if hasattr(rs_out, "children"):
-            return rs_out.children
-    except Exception:
-        pass
-    return ""
 
 # ----------------------------
 # CAD callbacks
@@ -868,30 +1223,27 @@ def cad_generate(_n, brief, fmt, use_ctx, store):
 
 @app.callback(
     Output("cad-download-out", "data"),
-    Input("cad-download", "n_clicks"),
-    State("cad-format", "value"),
-    State("cad-code", "value"),
-    prevent_initial_call=True,
-)
-def cad_download(_n, fmt, code):
-    filename = "part.scad" if fmt == "openscad" else "part_freecad_macro.py"
-    return dcc.send_string(code or "", filename=filename)
-
-@app.callback(
     Output("cad-render-out", "children"),
+    Input("cad-download", "n_clicks"),
     Input("cad-render", "n_clicks"),
     State("cad-format", "value"),
     State("cad-code", "value"),
     prevent_initial_call=True,
 )
-def cad_render(_n, fmt, code):
+def cad_export_actions(n_download, n_render, fmt, code):
+    trig = callback_context.triggered[0]["prop_id"].split(".")[0]
+
+    if trig == "cad-download":
+        filename = "part.scad" if fmt == "openscad" else "part_freecad_macro.py"
+        return dcc.send_string(code or "", filename=filename), dash.no_update
+
     if not CAD_RENDER_URL:
-        return dbc.Alert("CAD_RENDER_URL not configured.", color="warning")
+        return dash.no_update, dbc.Alert("CAD_RENDER_URL not configured.", color="warning")
     try:
         res = _post_json(CAD_RENDER_URL, {"format": fmt, "code": code})
-        return monospace_block(json.dumps(res, indent=2))
+        return dash.no_update, monospace_block(json.dumps(res, indent=2))
     except Exception as e:
-        return dbc.Alert(f"Render failed: {e}", color="danger")
+        return dash.no_update, dbc.Alert(f"Render failed: {e}", color="danger")
 
 # ----------------------------
 # Digital twin callbacks
@@ -899,17 +1251,32 @@ def cad_render(_n, fmt, code):
 @app.callback(
     Output("dt-output", "children"),
     Output("last-dt-result", "data"),
+    Output("ws-notes", "value", allow_duplicate=True),
     Input("dt-submit", "n_clicks"),
+    Input("dt-analyze", "n_clicks"),
     State("dt-scenario", "value"),
     State("dt-params", "value"),
     State("dt-use-context", "value"),
+    State("last-dt-result", "data"),
     State("ws-store", "data"),
     prevent_initial_call=True,
 )
-def dt_submit(_n, scenario, params_txt, use_ctx, store):
-    if not DIGITAL_TWIN_URL:
-        return dbc.Alert("DIGITAL_TWIN_URL not configured.", color="warning"), dash.no_update
+def digital_twin_actions(n_submit, n_analyze, scenario, params_txt, use_ctx, last, store):
+    # Submit and analyze share one store hydration; each fills only its own outputs
+    trig = callback_context.triggered[0]["prop_id"].split(".")[0]
     store = store or {}
+
+    if trig == "dt-analyze":
+        ctx = build_context_pack(store)
+        if not last:
+            return dash.no_update, dash.no_update, (store.get("notes") or "") + "\n\n(No digital twin result to analyze.)"
+        prompt = "Analyze this digital twin result. Summarize key metrics, failures, and propose next experiments.\n\nRESULT:\n" + _fit_tokens(json.dumps(last), 4000) + "\n\nCONTEXT:\n" + ctx
+        res = call_mother_llm(prompt, context_pack=None, max_tokens=1400)
+        content = res.get("content") or res.get("response") or res.get("text") or json.dumps(res, indent=2)
+        return dash.no_update, dash.no_update, (store.get("notes") or "") + "\n\n---\nDigital Twin Analysis\n" + content
+
+    if not DIGITAL_TWIN_URL:
+        return dbc.Alert("DIGITAL_TWIN_URL not configured.", color="warning"), dash.no_update, dash.no_update
     context_pack = build_context_pack(store) if (use_ctx and "yes" in use_ctx) else None
     params = {}
     if params_txt:
@@ -920,26 +1287,9 @@ def dt_submit(_n, scenario, params_txt, use_ctx, store):
     payload = {"scenario": scenario or "", "params": params, "context_pack": context_pack}
     try:
         res = _post_json(DIGITAL_TWIN_URL, payload)
-        return monospace_block(json.dumps(res, indent=2)), res
+        return monospace_block(json.dumps(res, indent=2)), res, dash.no_update
     except Exception as e:
-        return dbc.Alert(f"Submit failed: {e}", color="danger"), dash.no_update
-
-@app.callback(
-    Output("ws-notes", "value", allow_duplicate=True),
-    Input("dt-analyze", "n_clicks"),
-    State("last-dt-result", "data"),
-    State("ws-store", "data"),
-    prevent_initial_call=True,
-)
-def dt_analyze(_n, last, store):
-    store = store or {}
-    ctx = build_context_pack(store)
-    if not last:
-        return (store.get("notes") or "") + "\n\n(No digital twin result to analyze.)"
-    prompt = "Analyze this digital twin result. Summarize key metrics, failures, and propose next experiments.\n\nRESULT:\n" + json.dumps(last) + "\n\nCONTEXT:\n" + ctx
-    res = call_mother_llm(prompt, context_pack=None, max_tokens=1400)
-    content = res.get("content") or res.get("response") or res.get("text") or json.dumps(res, indent=2)
-    return (store.get("notes") or "") + "\n\n---\nDigital Twin Analysis\n" + content
+        return dbc.Alert(f"Submit failed: {e}", color="danger"), dash.no_update, dash.no_update
 
 if __name__ == "__main__":
     app.run_server(
@@ -0,0 +1,101 @@
+// Upload previews cached in IndexedDB, keyed by upload id, so the session
+// stores only carry the upload index. Falls back to an in-memory map where
+// IndexedDB is unavailable (e.g. some private browsing modes).
+//
+// IndexedDB is shared by every tab of the origin while the upload index lives
+// in per-tab session storage, so keys are namespaced with a per-tab id and a
+// tab only evicts its own previews. Entries left behind by closed tabs are
+// dropped once they are older than MAX_AGE_MS.
+(function () {
+    var DB_NAME = "msai-workspace";
+    var STORE = "previews";
+    var TAB_KEY = "msai-preview-tab";
+    var MAX_AGE_MS = 7 * 24 * 3600 * 1000;
+    var memory = new Map();
+    var dbPromise = null;
+
+    function tabId() {
+        // sessionStorage is per tab and survives reloads, like the ws-store it pairs with
+        try {
+            var id = window.sessionStorage.getItem(TAB_KEY);
+            if (!id) {
+                id = Date.now().toString(36) + Math.random().toString(36).slice(2, 10);
+                window.sessionStorage.setItem(TAB_KEY, id);
+            }
+            return id;
+        } catch (e) {
+            return "default";
+        }
+    }
+
+    var PREFIX = tabId() + ":";
+
+    function openDb() {
+        if (!dbPromise) {
+            dbPromise = new Promise(function (resolve, reject) {
+                if (!window.indexedDB) {
+                    reject(new Error("IndexedDB unavailable"));
+                    return;
+                }
+                var req = window.indexedDB.open(DB_NAME, 1);
+                req.onupgradeneeded = function () { req.result.createObjectStore(STORE); };
+                req.onsuccess = function () { resolve(req.result); };
+                req.onerror = function () { reject(req.error); };
+            });
+        }
+        return dbPromise;
+    }
+
+    function transact(mode, fn) {
+        return openDb().then(function (db) {
+            return new Promise(function (resolve, reject) {
+                var tx = db.transaction(STORE, mode);
+                var req = fn(tx.objectStore(STORE));
+                tx.oncomplete = function () { resolve(req ? req.result : undefined); };
+                tx.onerror = tx.onabort = function () { reject(tx.error); };
+            });
+        });
+    }
+
+    window.storeCache = {
+        getPreview: function (id) {
+            return transact("readonly", function (store) { return store.get(PREFIX + id); })
+                .then(function (entry) { return entry === undefined ? memory.get(id) : entry.item; })
+                .catch(function () { return memory.get(id); });
+        },
+
+        // Store a batch of previews and drop this tab's previews whose upload is no longer listed
+        putPreviews: function (items, keepIds) {
+            var keep = new Set(keepIds);
+            var now = Date.now();
+            Object.keys(items).forEach(function (id) { memory.set(id, items[id]); });
+            memory.forEach(function (_, id) { if (!keep.has(id)) memory.delete(id); });
+
+            return transact("readwrite", function (store) {
+                Object.keys(items).forEach(function (id) {
+                    store.put({item: items[id], ts: now}, PREFIX + id);
+                });
+                var cursor = store.openCursor();
+                cursor.onsuccess = function () {
+                    var c = cursor.result;
+                    if (!c) {
+                        return;
+                    }
+                    var key = String(c.key);
+                    var entry = c.value;
+                    if (key.indexOf(PREFIX) === 0) {
+                        if (!keep.has(key.slice(PREFIX.length))) {
+                            c.delete();
+                        } else if (entry && entry.ts !== now) {
+                            c.update({item: entry.item, ts: now});  // still listed: keep it fresh
+                        }
+                    } else if (!entry || typeof entry.ts !== "number" || now - entry.ts > MAX_AGE_MS) {
+                        // Another tab's stale preview, or one written before keys were namespaced
+                        c.delete();
+                    }
+                    c.continue();
+                };
+            }).catch(function () {});
+        }
+    };
+})();
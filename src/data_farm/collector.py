@@ -4,11 +4,32 @@ Data collection from various sources
 import os
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List
 from pathlib import Path
 import numpy as np
 from tqdm import tqdm
 
+def _make_session() -> requests.Session:
+    """Pooled session shared by all downloads; retries connection errors and transient 5xx/429"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=True,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+SESSION = _make_session()
+
 class DataCollector:
     """Collect robotics training data from open sources"""
 
@@ -29,18 +50,23 @@ class DataCollector:
     def _download_file(self, url: str, save_path: Path):
         """Download file with progress bar"""
         try:
-            response = requests.get(url, stream=True)
+            response = SESSION.get(url, stream=True)
+            response.raw.decode_content = True
             total_size = int(response.headers.get('content-length', 0))
 
-            with open(save_path, 'wb') as f, tqdm(
+            # 1 MiB reads into one reused buffer; the file is unbuffered since
+            # each write is already a full chunk
+            buf = bytearray(1 << 20)
+            view = memoryview(buf)
+            with response, open(save_path, 'wb', buffering=0) as f, tqdm(
                 desc=save_path.name,
                 total=total_size,
                 unit='iB',
                 unit_scale=True
             ) as pbar:
-                for data in response.iter_content(chunk_size=1024):
-                    size = f.write(data)
-                    pbar.update(size)
+                while n := response.raw.readinto(buf):
+                    f.write(view[:n])
+                    pbar.update(n)
         except Exception as e:
             print(f"Download error: {e}")
 
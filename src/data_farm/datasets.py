@@ -1,15 +1,23 @@
 """
 PyTorch and TensorFlow dataset classes
 """
+import os
+
 import torch
 from torch.utils.data import Dataset
 import numpy as np
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 import json
 
 class RoboticsDataset(Dataset):
-    """PyTorch dataset for robotics data"""
+    """
+    PyTorch dataset for robotics data
+
+    Arrays from <data_dir>/<split>.npz are unpacked once into a
+    <data_dir>/<split>.mmap/ cache directory and memory-mapped from there;
+    the cache is refreshed when the .npz is newer.
+    """
 
     def __init__(self, data_dir: Path, split: str = "train", transform=None):
         self.data_dir = Path(data_dir)
@@ -18,14 +26,44 @@ class RoboticsDataset(Dataset):
 
         # Load data
         if (self.data_dir / f"{split}.npz").exists():
-            data = np.load(self.data_dir / f"{split}.npz")
+            data = self._load_mmap(self.data_dir / f"{split}.npz")
             self.images = data['images']
-            self.labels = data.get('labels', data.get('depths', None))
+            self.labels = data.get('labels', data.get('depths'))
         else:
             # Create sample data if not found
             self.images = np.random.randint(0, 255, (100, 64, 64, 3), dtype=np.uint8)
             self.labels = np.random.randint(0, 10, (100,), dtype=np.int32)
 
+    @staticmethod
+    def _load_mmap(npz_path: Path) -> dict:
+        """
+        Memory-map the arrays of an .npz file. Zip members can't be mapped, so
+        each array is unpacked once to <split>.mmap/<key>.npy beside the
+        archive; workers then share the page cache instead of each holding its
+        own copy. Files are written under a per-process temporary name and
+        renamed into place, so concurrent DDP ranks never map a partial file.
+        """
+        cache_dir = npz_path.with_suffix('.mmap')
+        arrays = {}
+        with np.load(npz_path) as data:
+            for key in data.files:
+                npy_path = cache_dir / f"{key}.npy"
+                try:
+                    if not npy_path.exists() or npy_path.stat().st_mtime < npz_path.stat().st_mtime:
+                        cache_dir.mkdir(exist_ok=True)
+                        tmp_path = cache_dir / f"{key}.{os.getpid()}.tmp"
+                        try:
+                            with open(tmp_path, 'wb') as f:
+                                np.save(f, data[key])
+                            os.replace(tmp_path, npy_path)
+                        finally:
+                            tmp_path.unlink(missing_ok=True)
+                    arrays[key] = np.load(npy_path, mmap_mode='r')
+                except OSError:
+                    # Read-only dataset directory: fall back to loading into memory
+                    arrays[key] = data[key]
+        return arrays
+
     def __len__(self) -> int:
         return len(self.images)
 
@@ -33,8 +71,8 @@ class RoboticsDataset(Dataset):
         image = self.images[idx]
         label = self.labels[idx] if self.labels is not None else 0
 
-        # Convert to tensor
-        image = torch.from_numpy(image).float()
+        # Convert to tensor (copies just this sample out of the memory map)
+        image = torch.from_numpy(np.array(image)).float()
         if image.dim() == 2:  # Grayscale
             image = image.unsqueeze(0)
         elif image.dim() == 3 and image.shape[2] == 3:  # RGB
@@ -48,6 +86,47 @@ class RoboticsDataset(Dataset):
 
         return image, label
 
+    def __getitems__(self, indices: List[int]) -> List[Tuple[torch.Tensor, torch.Tensor]]:
+        """Batched fetch used by DataLoader: one vectorized read for all indices"""
+        images = torch.from_numpy(np.array(self.images[indices])).float()
+        if images.dim() == 3:  # Grayscale
+            images = images.unsqueeze(1)
+        elif images.dim() == 4 and images.shape[3] == 3:  # RGB
+            images = images.permute(0, 3, 1, 2)
+
+        if self.labels is not None:
+            labels = torch.from_numpy(np.array(self.labels[indices])).long()
+        else:
+            labels = torch.zeros(len(indices), dtype=torch.long)
+
+        if self.transform:
+            images = [self.transform(image) for image in images]
+        return list(zip(images, labels))
+
+class PreloadedDataset(Dataset):
+    """Dataset materialized once onto a device; items are device-side slices"""
+
+    def __init__(self, dataset: Dataset, device: str = "cuda"):
+        images, labels = zip(*(dataset[i] for i in range(len(dataset))))
+        self.images = torch.stack(images).to(device, non_blocking=True)
+        self.labels = torch.stack(labels).to(device, non_blocking=True)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __getitem__(self, idx: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        return self.images[idx], self.labels[idx]
+
+    @staticmethod
+    def fits_on_device(dataset: Dataset, max_fraction: float = 0.5) -> bool:
+        """Whether the dataset would take at most max_fraction of free VRAM"""
+        if not torch.cuda.is_available() or len(dataset) == 0:
+            return False
+        image, label = dataset[0]
+        item_bytes = image.element_size() * image.numel() + label.element_size() * label.numel()
+        free_bytes, _ = torch.cuda.mem_get_info()
+        return item_bytes * len(dataset) <= free_bytes * max_fraction
+
 class RoboticsDatasets:
     """Dataset registry"""
 
@@ -2,11 +2,13 @@
 Data management and versioning
 """
 import hashlib
-import json
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import orjson
+
 class DataManager:
     """Manage datasets with versioning"""
 
@@ -18,8 +20,7 @@ class DataManager:
     def _load_metadata(self):
         """Load dataset metadata"""
         if self.metadata_file.exists():
-            with open(self.metadata_file) as f:
-                self.metadata = json.load(f)
+            self.metadata = orjson.loads(self.metadata_file.read_bytes())
         else:
             self.metadata = {
                 'datasets': {},
@@ -31,12 +32,16 @@ class DataManager:
         """Save dataset metadata"""
         self.metadata['last_updated'] = datetime.now().isoformat()
         self.metadata_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.metadata_file, 'w') as f:
-            json.dump(self.metadata, f, indent=2)
+
+        # Write to a temp file and rename over the original, so a crash
+        # mid-write never leaves a truncated metadata file behind
+        tmp_file = self.metadata_file.with_suffix('.json.tmp')
+        tmp_file.write_bytes(orjson.dumps(self.metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        os.replace(tmp_file, self.metadata_file)
 
     def register_dataset(self, name: str, path: Path, description: str = ""):
         """Register a dataset in the metadata"""
-        dataset_id = hashlib.md5(str(path).encode()).hexdigest()[:8]
+        dataset_id = hashlib.blake2b(str(path).encode(), digest_size=4).hexdigest()
 
         self.metadata['datasets'][name] = {
             'id': dataset_id,
@@ -2,16 +2,16 @@
 Process and prepare robotics data
 """
 import numpy as np
-import cv2
 from pathlib import Path
 from typing import Dict
-import json
+import orjson
 
 class DataProcessor:
     """Process robotics data for training"""
 
     def __init__(self, data_dir: str = "data/datasets"):
         self.data_dir = Path(data_dir)
+        self.rng = np.random.default_rng()
 
     def process_coco(self):
         """Process COCO dataset for object detection"""
@@ -41,19 +41,20 @@ class DataProcessor:
             ]
         }
 
-        with open(output_dir / "processed_annotations.json", 'w') as f:
-            json.dump(sample_data, f, indent=2)
+        # Integer category ids are written as string keys, as json.dump did
+        (output_dir / "processed_annotations.json").write_bytes(
+            orjson.dumps(sample_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
 
         print(f"Sample COCO data created at {output_dir}")
 
     def augment_images(self, images: np.ndarray) -> np.ndarray:
         """Apply data augmentation to images"""
-        augmented = []
+        images = np.ascontiguousarray(images)
 
-        for img in images:
-            # Random flip
-            if np.random.random() > 0.5:
-                img = cv2.flip(img, 1)
-            augmented.append(img)
+        # Random horizontal flip, selected and applied to the whole batch at once
+        flip = self.rng.random(len(images)) > 0.5
+        augmented = images.copy()
+        augmented[flip] = images[flip][:, :, ::-1]
 
-        return np.array(augmented)
+        return augmented
@@ -4,25 +4,121 @@ Inference engine for robotics models with benchmarking
 import torch
 import torch.nn as nn
 import numpy as np
+import copy
+import math
+import platform
+import random
 import time
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterable, List, Optional, Union
 import json
 
+try:
+    import tensorrt as trt
+    TENSORRT_AVAILABLE = True
+except ImportError:
+    TENSORRT_AVAILABLE = False
+
+try:
+    import onnx
+    import onnxsim
+    ONNXSIM_AVAILABLE = True
+except ImportError:
+    ONNXSIM_AVAILABLE = False
+
+if TENSORRT_AVAILABLE:
+    class _EntropyCalibrator(trt.IInt8EntropyCalibrator2):
+        """Feeds preprocessed CUDA batches to TensorRT's INT8 calibration"""
+
+        def __init__(self, batches: List[torch.Tensor], cache_path: Path):
+            super().__init__()
+            self._batches = iter(batches)
+            self._batch_size = batches[0].shape[0]
+            self._cache_path = cache_path
+            self._current = None
+
+        def get_batch_size(self):
+            return self._batch_size
+
+        def get_batch(self, names):
+            self._current = next(self._batches, None)  # keeps the device memory alive
+            return None if self._current is None else [int(self._current.data_ptr())]
+
+        def read_calibration_cache(self):
+            return self._cache_path.read_bytes() if self._cache_path.exists() else None
+
+        def write_calibration_cache(self, cache):
+            self._cache_path.write_bytes(bytes(cache))
+
+# Recent timings kept by infer(benchmark=True); older entries are dropped
+INFERENCE_TIME_HISTORY = 10000
+
+class _RunningStats:
+    """
+    Constant-memory timing statistics: Welford mean/variance, running
+    min/max, and a fixed-size reservoir sample for the median (exact while
+    the sample count fits in the reservoir)
+    """
+
+    def __init__(self, reservoir_size: int = 4096):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._reservoir = []
+        self._reservoir_size = reservoir_size
+
+    def add(self, x: float):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+        self.total += x
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        if len(self._reservoir) < self._reservoir_size:
+            self._reservoir.append(x)
+        else:
+            j = random.randrange(self.n)
+            if j < self._reservoir_size:
+                self._reservoir[j] = x
+
+    @property
+    def std(self) -> float:
+        # Population std, matching np.std
+        return math.sqrt(self._m2 / self.n) if self.n else 0.0
+
+    @property
+    def median(self) -> float:
+        return float(np.median(self._reservoir)) if self._reservoir else 0.0
+
 class InferenceEngine:
     """Real-time inference engine with benchmarking"""
 
     def __init__(self,
                  model: nn.Module,
                  device: Optional[str] = None,
-                 precision: str = 'fp32'):
+                 precision: str = 'fp32',
+                 example_input_shape: Optional[tuple] = None,
+                 jit: bool = True,
+                 compile: bool = False):
         """
         Initialize inference engine
 
         Args:
             model: PyTorch model
             device: Device to run inference on ('cuda' or 'cpu')
-            precision: Precision mode ('fp32', 'fp16', 'int8')
+            precision: Precision mode ('fp32', 'fp16', 'bf16', 'int8'); INT8
+                takes effect through quantize() on CPU or
+                export_tensorrt(precision='int8') on CUDA
+            example_input_shape: Input shape to trace with, e.g. (1, 3, 224, 224)
+            jit: Serve a frozen TorchScript trace of the model (FP32 only,
+                needs example_input_shape)
+            compile: Serve torch.compile(mode='reduce-overhead') instead of
+                TorchScript; each new input shape triggers a recompile
         """
         self.model = model
         self.precision = precision
@@ -37,14 +133,64 @@ class InferenceEngine:
         self.model = self.model.to(self.device)
         self.model.eval()
 
-        # Apply precision optimization
-        if precision == 'fp16' and self.device.type == 'cuda':
-            self.model = self.model.half()
+        if self.device.type == 'cuda':
+            # Fixed-shape inference: let cuDNN autotune conv algorithms once,
+            # allow TF32 tensor cores, and use NHWC for conv kernels
+            torch.backends.cudnn.benchmark = True
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            self.model = self.model.to(memory_format=torch.channels_last)
+
+        # Reduced precision runs under autocast, keeping FP32 weights and
+        # FP32 reductions/softmax; FP16 autocast is CUDA-only
+        amp_dtypes = {'fp16': torch.float16, 'bf16': torch.bfloat16}
+        self.amp_dtype = amp_dtypes.get(precision)
+        if self.amp_dtype == torch.float16 and self.device.type != 'cuda':
+            self.amp_dtype = None
+
+        # self.model is what infer() calls; the eager module is kept for
+        # checkpoint loading, export and parameter counts
+        self._eager_model = self.model
+        self.example_input_shape = example_input_shape
+        self.compiled = compile and hasattr(torch, 'compile')
+        self.frozen = False
+        self.quantized = False
+
+        # Generic preprocessing until configure_input() specializes it; set
+        # before the compile warmup below, which goes through preprocess()
+        self._prep_fn = self._preprocess_generic
+
+        if self.compiled:
+            # Inductor fuses pointwise ops and replays CUDA graphs; compiling
+            # here keeps the first request from paying for it
+            self.model = torch.compile(self._eager_model, mode='reduce-overhead')
+            if example_input_shape is not None:
+                self.warmup(torch.rand(example_input_shape), iterations=2)
+        elif jit and example_input_shape is not None and self.amp_dtype is None:
+            self._freeze()
 
         # Benchmarking stats
-        self.inference_times = []
+        self.inference_times = deque(maxlen=INFERENCE_TIME_HISTORY)
         self.total_inferences = 0
 
+    def _freeze(self):
+        """Trace, freeze and optimize the eager model; frozen weights are inlined as constants"""
+        example = self._to_memory_format(torch.randn(self.example_input_shape, device=self.device))
+        try:
+            with torch.no_grad():
+                traced = torch.jit.trace(self._eager_model, example)
+                frozen = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+                # The profiling executor specializes and fuses on the first runs
+                for _ in range(2):
+                    frozen(example)
+        except RuntimeError as e:
+            print(f"⚠ Warning: TorchScript freeze failed, using eager model: {e}")
+            self.model = self._eager_model
+            self.frozen = False
+            return
+        self.model = frozen
+        self.frozen = True
+
     def preprocess(self, input_data: Union[np.ndarray, torch.Tensor]) -> torch.Tensor:
         """
         Preprocess input data
@@ -55,69 +201,181 @@ class InferenceEngine:
         Returns:
             Preprocessed tensor
         """
-        # Convert to tensor if needed
+        return self._prep_fn(input_data)
+
+    def configure_input(self, shape: tuple, dtype=np.uint8, layout: str = 'NHWC',
+                        normalize: Optional[bool] = None):
+        """
+        Specialize preprocess() for a fixed input format. The type, layout and
+        range checks are decided once here, which also drops the max()
+        reduction the generic path launches to detect 0-255 data. Inputs that
+        don't match still go through the generic path.
+
+        Args:
+            shape: numpy input shape as passed to infer(), e.g. (480, 640, 3)
+            dtype: numpy input dtype
+            layout: 'NHWC'/'HWC' for channels-last images, 'NCHW'/'CHW' otherwise
+            normalize: Scale by 1/255; defaults to True for uint8 inputs
+        """
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        add_batch = len(shape) == 3
+        channels_last = layout.upper() in ('NHWC', 'HWC')
+        if normalize is None:
+            normalize = dtype == np.uint8
+        on_cuda = self.device.type == 'cuda'
+        # A float32 input on CPU is not copied, so it must not be scaled in place
+        scale_in_place = on_cuda or dtype != np.float32
+
+        def prep(input_data):
+            if (not isinstance(input_data, np.ndarray) or input_data.shape != shape
+                    or input_data.dtype != dtype):
+                return self._preprocess_generic(input_data)
+            data = torch.from_numpy(input_data)
+            if add_batch:
+                data = data.unsqueeze(0)
+            if on_cuda:
+                data = data.pin_memory().to(self.device, non_blocking=True)
+            if channels_last:
+                data = data.permute(0, 3, 1, 2)
+            data = data.float()
+            if normalize:
+                data = data.div_(255.0) if scale_in_place else data / 255.0
+            return self._to_memory_format(data)
+
+        self._prep_fn = prep
+
+    def _preprocess_generic(self, input_data: Union[np.ndarray, torch.Tensor]) -> torch.Tensor:
+        """Preprocess input of any supported type, layout and range"""
+        # Convert to tensor if needed, keeping the source dtype (uint8 images
+        # cross the PCIe bus at a quarter of the float32 size)
         if isinstance(input_data, np.ndarray):
-            data = torch.from_numpy(input_data).float()
+            data = torch.from_numpy(input_data)
         else:
-            data = input_data.float()
-
-        # Normalize if image data (0-255 range)
-        if data.max() > 1.0:
-            data = data / 255.0
+            data = input_data
 
         # Add batch dimension if needed
         if data.dim() == 3:
             data = data.unsqueeze(0)
 
+        if self.device.type == 'cuda' and not data.is_cuda:
+            # Pinned staging (PyTorch caches the pinned blocks) allows an async copy
+            data = data.pin_memory().to(self.device, non_blocking=True)
+        else:
+            data = data.to(self.device)
+
         # Ensure correct channel order (C, H, W)
         if data.dim() == 4 and data.shape[-1] == 3:
             data = data.permute(0, 3, 1, 2)
 
-        # Apply precision
-        if self.precision == 'fp16' and self.device.type == 'cuda':
-            data = data.half()
+        # Cast and normalize on the device; uint8 is always 0-255 image data
+        if data.dtype == torch.uint8:
+            return self._to_memory_format(data.float().div_(255.0))
+        data = data.float()
+        if data.max() > 1.0:
+            data = data / 255.0
+        return self._to_memory_format(data)
 
-        return data.to(self.device)
+    def _to_memory_format(self, data: torch.Tensor) -> torch.Tensor:
+        """Image batches match the model's channels_last layout on CUDA"""
+        if self.device.type == 'cuda' and data.dim() == 4:
+            return data.contiguous(memory_format=torch.channels_last)
+        return data
 
-    def postprocess(self, output: torch.Tensor) -> Dict:
+    def postprocess(self, output: torch.Tensor, return_probs: bool = False) -> Dict:
         """
         Postprocess model output
 
         Args:
             output: Model output tensor
+            return_probs: Include the softmax probabilities for classification
 
         Returns:
             Dictionary with processed results
         """
-        # Move to CPU and convert to numpy
-        output = output.cpu()
-
         # Classification output
         if output.dim() == 2 and output.size(1) > 1:
-            probabilities = torch.softmax(output, dim=1)
-            confidence, predicted_class = torch.max(probabilities, dim=1)
+            return self.postprocess_batch(output, return_probs)[0]
 
-            return {
-                'class': predicted_class.item(),
-                'confidence': confidence.item(),
-                'probabilities': probabilities.numpy()
-            }
+        # Regression or other outputs (autocast outputs may be FP16/BF16)
+        return {
+            'output': output.cpu().float().numpy()
+        }
+
+    def postprocess_batch(self, output: torch.Tensor, return_probs: bool = False) -> List[Dict]:
+        """
+        Postprocess a batch of model outputs into one result per sample
+
+        Args:
+            output: Model output tensor with a leading batch dimension
+            return_probs: Include the softmax probabilities for classification
+
+        Returns:
+            List of result dictionaries
+        """
+        # Classification output: reduce on the device, copy back only class and confidence
+        if output.dim() == 2 and output.size(1) > 1:
+            logits = output.float()
+            if return_probs:
+                probabilities = torch.softmax(logits, dim=1)
+                confidence, predicted_class = probabilities.max(dim=1)
+            else:
+                # The top softmax probability is exp(max - logsumexp); no full
+                # [B, C] probability tensor is materialized
+                max_logit, predicted_class = logits.max(dim=1)
+                confidence = torch.exp(max_logit - torch.logsumexp(logits, dim=1))
+            results = [
+                {'class': c, 'confidence': p}
+                for c, p in zip(predicted_class.tolist(), confidence.tolist())
+            ]
+            if return_probs:
+                probabilities = probabilities.cpu().numpy()
+                for i, result in enumerate(results):
+                    result['probabilities'] = probabilities[i:i + 1]
+            return results
 
         # Regression or other outputs
-        else:
-            return {
-                'output': output.numpy()
-            }
+        output = output.cpu().float().numpy()
+        return [{'output': output[i:i + 1]} for i in range(len(output))]
+
+    def _model_forward(self, input_tensor: torch.Tensor) -> torch.Tensor:
+        if self.amp_dtype is None:
+            return self.model(input_tensor)
+        with torch.autocast(device_type=self.device.type, dtype=self.amp_dtype):
+            return self.model(input_tensor)
 
-    @torch.no_grad()
+    def _forward(self, input_tensor: torch.Tensor, timed: bool):
+        """
+        Run the model, returning (output, seconds) when timed, else (output, None).
+        CUDA launches are asynchronous, so GPU time is measured with CUDA events
+        and the end event is synchronized before reading it.
+        """
+        if not timed:
+            return self._model_forward(input_tensor), None
+
+        if self.device.type == 'cuda':
+            start = torch.cuda.Event(enable_timing=True)
+            end = torch.cuda.Event(enable_timing=True)
+            start.record()
+            output = self._model_forward(input_tensor)
+            end.record()
+            end.synchronize()
+            return output, start.elapsed_time(end) / 1000.0
+
+        start_time = time.perf_counter()
+        output = self._model_forward(input_tensor)
+        return output, time.perf_counter() - start_time
+
+    @torch.inference_mode()
     def infer(self, input_data: Union[np.ndarray, torch.Tensor],
-              benchmark: bool = False) -> Dict:
+              benchmark: bool = False, return_probs: bool = False) -> Dict:
         """
         Run inference on input data
 
         Args:
             input_data: Input data
             benchmark: Whether to record timing
+            return_probs: Include the softmax probabilities for classification
 
         Returns:
             Dictionary with inference results
@@ -126,47 +384,108 @@ class InferenceEngine:
         input_tensor = self.preprocess(input_data)
 
         # Run inference with timing
-        if benchmark:
-            start_time = time.time()
-
-        output = self.model(input_tensor)
+        output, inference_time = self._forward(input_tensor, benchmark)
 
         if benchmark:
-            inference_time = time.time() - start_time
             self.inference_times.append(inference_time)
             self.total_inferences += 1
 
         # Postprocess
-        result = self.postprocess(output)
+        result = self.postprocess(output, return_probs)
 
         if benchmark:
             result['inference_time'] = inference_time
 
         return result
 
+    @torch.inference_mode()
     def infer_batch(self, batch_data: List[Union[np.ndarray, torch.Tensor]],
-                   benchmark: bool = False) -> List[Dict]:
+                   benchmark: bool = False, return_probs: bool = False) -> List:
         """
         Run inference on batch of data
 
         Args:
             batch_data: List of input data
             benchmark: Whether to record timing
+            return_probs: Include the softmax probabilities for classification
 
         Returns:
-            List of inference results
+            One entry per input: a result dict, or a list of result dicts for
+            an input that already carried a batch dimension of N > 1
         """
-        results = []
+        if not batch_data:
+            return []
+
+        inputs = [self.preprocess(data) for data in batch_data]
+        if any(x.shape[1:] != inputs[0].shape[1:] for x in inputs):
+            # Mixed shapes can't share one forward pass
+            results = []
+            for x in inputs:
+                output, inference_time = self._forward(x, benchmark)
+                if benchmark:
+                    self.inference_times.append(inference_time)
+                    self.total_inferences += 1
+                results.append(self._postprocess_input(output, return_probs, inference_time))
+            return results
+
+        batch = torch.cat(inputs)
+
+        # Run one forward pass for the whole batch
+        output, inference_time = self._forward(batch, benchmark)
 
-        for data in batch_data:
-            result = self.infer(data, benchmark=benchmark)
-            results.append(result)
+        if benchmark:
+            self.inference_times.append(inference_time)
+            self.total_inferences += len(batch_data)
 
+        # One result per input; inputs that already carried a batch dimension
+        # get their own slice of the output
+        if len(batch) == len(inputs):
+            results = self.postprocess_batch(output, return_probs)
+            if benchmark:
+                for result in results:
+                    result['inference_time'] = inference_time
+            return results
+
+        results = []
+        offset = 0
+        for x in inputs:
+            results.append(self._postprocess_input(output[offset:offset + x.shape[0]],
+                                                   return_probs, inference_time))
+            offset += x.shape[0]
         return results
 
+    def _postprocess_input(self, output: torch.Tensor, return_probs: bool,
+                           inference_time: Optional[float]):
+        """Results for one infer_batch input: a dict, or one dict per sample if it was batched"""
+        results = self.postprocess_batch(output, return_probs)
+        if inference_time is not None:
+            for result in results:
+                result['inference_time'] = inference_time
+        return results[0] if len(results) == 1 else results
+
+    @torch.inference_mode()
+    def warmup(self, sample_input: Union[np.ndarray, torch.Tensor], iterations: int = 10):
+        """
+        Run untimed forward passes so the first real request doesn't pay for
+        CUDA context creation, cuDNN autotuning and allocator growth
+
+        Args:
+            sample_input: Input with the shape served in production
+            iterations: Number of warmup iterations
+        """
+        input_tensor = self.preprocess(sample_input)
+        for _ in range(iterations):
+            self._model_forward(input_tensor)
+
+        if self.device.type == 'cuda':
+            torch.cuda.synchronize(self.device)
+
+    @torch.inference_mode()
     def benchmark_model(self, test_input: torch.Tensor,
                        num_iterations: int = 100,
-                       warmup_iterations: int = 10) -> Dict:
+                       warmup_iterations: int = 10,
+                       record_trace: bool = False,
+                       include_transfer: bool = False) -> Dict:
         """
         Benchmark model performance
 
@@ -174,6 +493,11 @@ class InferenceEngine:
             test_input: Test input tensor
             num_iterations: Number of benchmark iterations
             warmup_iterations: Number of warmup iterations
+            record_trace: Also keep every timing in self.inference_times
+                (statistics are streamed, so memory stays constant otherwise)
+            include_transfer: Preprocess the host input every iteration, as a
+                served request would; on CUDA the next input's copy runs on a
+                side stream while the current forward pass computes
 
         Returns:
             Benchmark statistics
@@ -183,35 +507,62 @@ class InferenceEngine:
 
         # Warmup
         print("Warming up...")
-        for _ in range(warmup_iterations):
-            _ = self.infer(test_input, benchmark=False)
+        self.warmup(test_input, iterations=warmup_iterations)
 
         # Clear previous timing data
-        self.inference_times = []
+        self.inference_times = deque(maxlen=None if record_trace else INFERENCE_TIME_HISTORY)
+        running = _RunningStats()
+
+        # By default the input is preprocessed onto the device once and reused,
+        # so the loop only times and allocates for the forward pass itself
+        copy_stream = None
+        if include_transfer and self.device.type == 'cuda':
+            copy_stream = torch.cuda.Stream(device=self.device)
+            with torch.cuda.stream(copy_stream):
+                next_input = self.preprocess(test_input)
+        else:
+            input_tensor = self.preprocess(test_input)
 
         # Benchmark
         print("Benchmarking...")
+        wall_start = time.perf_counter()
         for i in range(num_iterations):
-            _ = self.infer(test_input, benchmark=True)
+            if copy_stream is not None:
+                torch.cuda.current_stream().wait_stream(copy_stream)
+                input_tensor = next_input
+                # Keep the allocator from reusing this buffer while the compute stream reads it
+                input_tensor.record_stream(torch.cuda.current_stream())
+                if i + 1 < num_iterations:
+                    with torch.cuda.stream(copy_stream):
+                        next_input = self.preprocess(test_input)
+            elif include_transfer:
+                input_tensor = self.preprocess(test_input)
+
+            _, inference_time = self._forward(input_tensor, timed=True)
+            running.add(inference_time)
+            if record_trace:
+                self.inference_times.append(inference_time)
+            self.total_inferences += 1
 
             if (i + 1) % 20 == 0:
                 print(f"Progress: {i + 1}/{num_iterations}")
-
-        # Calculate statistics
-        times = np.array(self.inference_times)
+        wall_time = time.perf_counter() - wall_start
 
         stats = {
             'device': str(self.device),
             'precision': self.precision,
             'num_iterations': num_iterations,
-            'mean_time': float(np.mean(times)),
-            'std_time': float(np.std(times)),
-            'min_time': float(np.min(times)),
-            'max_time': float(np.max(times)),
-            'median_time': float(np.median(times)),
-            'fps': float(1.0 / np.mean(times)),
-            'throughput': float(num_iterations / np.sum(times))
+            'mean_time': running.mean,
+            'std_time': running.std,
+            'min_time': running.min,
+            'max_time': running.max,
+            'median_time': running.median,
+            'fps': 1.0 / running.mean,
+            'throughput': num_iterations / running.total
         }
+        if include_transfer:
+            # Per-iteration times cover the forward pass; this includes the copies
+            stats['end_to_end_throughput'] = num_iterations / wall_time
 
         print("\nBenchmark Results:")
         print(f"Mean inference time: {stats['mean_time']*1000:.2f} ms")
@@ -220,6 +571,8 @@ class InferenceEngine:
         print(f"Max time: {stats['max_time']*1000:.2f} ms")
         print(f"FPS: {stats['fps']:.2f}")
         print(f"Throughput: {stats['throughput']:.2f} samples/sec")
+        if include_transfer:
+            print(f"End-to-end throughput: {stats['end_to_end_throughput']:.2f} samples/sec")
 
         return stats
 
@@ -233,16 +586,81 @@ class InferenceEngine:
         checkpoint = torch.load(checkpoint_path, map_location=self.device)
 
         if 'model_state_dict' in checkpoint:
-            self.model.load_state_dict(checkpoint['model_state_dict'])
+            self._eager_model.load_state_dict(checkpoint['model_state_dict'])
         else:
-            self.model.load_state_dict(checkpoint)
+            self._eager_model.load_state_dict(checkpoint)
 
-        self.model.eval()
+        self._eager_model.eval()
+
+        # Frozen weights are constants, so re-freeze with the new ones
+        if self.frozen:
+            self._freeze()
+        elif self.quantized:
+            print("⚠ Warning: Quantized model discarded for the new weights; call quantize() again")
+            self.model = self._eager_model
+            self.quantized = False
         print(f"Loaded checkpoint from {checkpoint_path}")
 
+    def quantize(self, calib_loader: Iterable,
+                 backend: Optional[str] = None,
+                 max_calib_batches: int = 32) -> bool:
+        """
+        Serve a static INT8 post-training quantized copy of the model on CPU
+        (on CUDA, use export_tensorrt(precision='int8') instead)
+
+        Args:
+            calib_loader: Iterable of input batches (or (input, target) pairs)
+                used to observe activation ranges
+            backend: Quantized engine, 'fbgemm' (x86) or 'qnnpack' (ARM);
+                chosen from the host CPU by default
+            max_calib_batches: Number of batches used for calibration
+
+        Returns:
+            True if the quantized model is now served, False if the backend
+            is unavailable and the FP32 model was kept
+        """
+        if self.device.type != 'cpu':
+            raise RuntimeError("quantize() is CPU-only; use export_tensorrt(precision='int8') on CUDA")
+
+        from torch.ao.quantization import get_default_qconfig_mapping
+        from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+        if backend is None:
+            backend = 'qnnpack' if platform.machine().lower() in ('arm64', 'aarch64') else 'fbgemm'
+        supported = torch.backends.quantized.supported_engines
+        if backend not in supported:
+            print(f"⚠ Warning: Quantized engine '{backend}' not available ({supported}), keeping FP32 model")
+            return False
+        torch.backends.quantized.engine = backend
+
+        batches = []
+        for batch in calib_loader:
+            if isinstance(batch, (list, tuple)):
+                batch = batch[0]
+            batches.append(self.preprocess(batch))
+            if len(batches) >= max_calib_batches:
+                break
+        if not batches:
+            raise ValueError("quantize() needs at least one calibration batch")
+
+        # FX mode folds Conv+BN and inserts observers; the eager model is left untouched
+        model = copy.deepcopy(self._eager_model).eval()
+        prepared = prepare_fx(model, get_default_qconfig_mapping(backend), example_inputs=(batches[0],))
+        with torch.no_grad():
+            for batch in batches:
+                prepared(batch)
+
+        self.model = convert_fx(prepared)
+        self.frozen = False
+        self.compiled = False
+        self.quantized = True
+        print(f"✓ Serving INT8 model ({backend}, {len(batches)} calibration batches)")
+        return True
+
     def export_onnx(self, output_path: Path,
                    input_shape: tuple,
-                   opset_version: int = 11):
+                   opset_version: int = 17,
+                   simplify: bool = True):
         """
         Export model to ONNX format
 
@@ -250,14 +668,13 @@ class InferenceEngine:
             output_path: Output path for ONNX model
             input_shape: Input tensor shape (batch_size, channels, height, width)
             opset_version: ONNX opset version
+            simplify: Constant-fold and fuse the graph with onnx-simplifier
+                when it is installed
         """
         dummy_input = torch.randn(input_shape).to(self.device)
 
-        if self.precision == 'fp16' and self.device.type == 'cuda':
-            dummy_input = dummy_input.half()
-
         torch.onnx.export(
-            self.model,
+            self._eager_model,
             dummy_input,
             output_path,
             export_params=True,
@@ -271,8 +688,98 @@ class InferenceEngine:
             }
         )
 
+        if simplify:
+            if ONNXSIM_AVAILABLE:
+                # Shape inference plus constant folding leaves a smaller graph
+                # that ONNX Runtime and TensorRT fuse more readily
+                simplified, ok = onnxsim.simplify(onnx.load(str(output_path)))
+                if ok:
+                    onnx.save(simplified, str(output_path))
+                else:
+                    print("⚠ Warning: onnxsim could not validate the simplified graph, keeping the original")
+            else:
+                print("⚠ Warning: onnxsim not installed, skipping ONNX simplification")
+
         print(f"Model exported to ONNX: {output_path}")
 
+    def export_tensorrt(self, output_path: Path,
+                        input_shape: tuple,
+                        precision: str = 'fp16',
+                        calib_loader: Optional[Iterable] = None,
+                        max_calib_batches: int = 32,
+                        workspace_gb: int = 1) -> Path:
+        """
+        Build a serialized TensorRT engine (.plan) from an ONNX export
+
+        Args:
+            output_path: Output path for the engine
+            input_shape: Input tensor shape; its batch size is the largest the
+                engine accepts
+            precision: 'fp16' or 'int8' (INT8 layers fall back to FP16)
+            calib_loader: Iterable of input batches (or (input, target)
+                pairs) for INT8 calibration; batches must match input_shape
+            max_calib_batches: Number of batches used for calibration
+            workspace_gb: Builder workspace size in GiB
+
+        Returns:
+            Path of the serialized engine
+        """
+        if not TENSORRT_AVAILABLE:
+            raise ImportError("tensorrt library required. Install with: pip install nvidia-tensorrt")
+        if precision not in ('fp16', 'int8'):
+            raise ValueError(f"Unsupported TensorRT precision: {precision}")
+        if precision == 'int8' and calib_loader is None:
+            raise ValueError("INT8 export needs a calib_loader")
+
+        output_path = Path(output_path)
+        onnx_path = output_path.with_suffix('.onnx')
+        self.export_onnx(onnx_path, input_shape, opset_version=17)
+
+        logger = trt.Logger(trt.Logger.WARNING)
+        builder = trt.Builder(logger)
+        network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+        parser = trt.OnnxParser(network, logger)
+        if not parser.parse(onnx_path.read_bytes()):
+            errors = "; ".join(str(parser.get_error(i)) for i in range(parser.num_errors))
+            raise RuntimeError(f"TensorRT could not parse {onnx_path}: {errors}")
+
+        config = builder.create_builder_config()
+        config.set_memory_pool_limit(trt.MemoryPoolType.WORKSPACE, workspace_gb << 30)
+        config.set_flag(trt.BuilderFlag.FP16)
+
+        # The ONNX export has a dynamic batch axis; serve batches of 1..input_shape[0]
+        profile = builder.create_optimization_profile()
+        profile.set_shape('input', (1, *input_shape[1:]), tuple(input_shape), tuple(input_shape))
+        config.add_optimization_profile(profile)
+
+        if precision == 'int8':
+            batches = []
+            with torch.no_grad():
+                for batch in calib_loader:
+                    if isinstance(batch, (list, tuple)):
+                        batch = batch[0]
+                    # TensorRT reads dense NCHW float32 device memory
+                    batch = self.preprocess(batch).contiguous()
+                    if tuple(batch.shape) != tuple(input_shape):
+                        continue  # calibration runs at the profile's opt shape; e.g. a short last batch
+                    batches.append(batch)
+                    if len(batches) == max_calib_batches:
+                        break
+            if not batches:
+                raise ValueError(f"calib_loader produced no batches of shape {tuple(input_shape)}")
+
+            config.set_flag(trt.BuilderFlag.INT8)
+            config.int8_calibrator = _EntropyCalibrator(batches, output_path.with_suffix('.calib'))
+            config.set_calibration_profile(profile)
+
+        engine = builder.build_serialized_network(network, config)
+        if engine is None:
+            raise RuntimeError("TensorRT engine build failed")
+        output_path.write_bytes(engine)
+
+        print(f"TensorRT {precision.upper()} engine exported: {output_path}")
+        return output_path
+
     def save_benchmark_results(self, stats: Dict, output_path: Path):
         """
         Save benchmark results to JSON
@@ -293,9 +800,13 @@ class InferenceEngine:
         Returns:
             Dictionary with model info
         """
-        # Count parameters
-        total_params = sum(p.numel() for p in self.model.parameters())
-        trainable_params = sum(p.numel() for p in self.model.parameters() if p.requires_grad)
+        # Count parameters in a single pass
+        total_params = trainable_params = 0
+        for p in self._eager_model.parameters():
+            n = p.numel()
+            total_params += n
+            if p.requires_grad:
+                trainable_params += n
 
         return {
             'device': str(self.device),
@@ -303,5 +814,8 @@ class InferenceEngine:
             'total_parameters': total_params,
             'trainable_parameters': trainable_params,
             'total_inferences': self.total_inferences,
-            'model_type': type(self.model).__name__
+            'model_type': type(self._eager_model).__name__,
+            'torchscript': self.frozen,
+            'compiled': self.compiled,
+            'quantized': self.quantized
         }
@@ -7,12 +7,22 @@ from torchvision import models
 from typing import Dict
 from pathlib import Path
 
+PYTORCH_MODEL_BUILDERS = {
+    'resnet18': lambda: models.resnet18(weights=models.ResNet18_Weights.DEFAULT),
+    'resnet50': lambda: models.resnet50(weights=models.ResNet50_Weights.DEFAULT),
+    'mobilenet_v2': lambda: models.mobilenet_v2(weights=models.MobileNet_V2_Weights.DEFAULT),
+    'faster_rcnn': lambda: torchvision.models.detection.fasterrcnn_resnet50_fpn(
+        weights=torchvision.models.detection.FasterRCNN_ResNet50_FPN_Weights.DEFAULT, progress=True
+    ),
+}
+
 class NVIDIAPretrained:
     """NVIDIA pre-trained models"""
 
     def __init__(self, models_dir: str = "models/nvidia_pretrained"):
         self.models_dir = Path(models_dir)
         self.models_dir.mkdir(parents=True, exist_ok=True)
+        self._cache: Dict[str, torch.nn.Module] = {}
 
     def load_pytorch_models(self):
         """Load PyTorch pre-trained models"""
@@ -20,26 +30,41 @@ class NVIDIAPretrained:
 
         models_dict = {}
 
-        # Vision models
-        models_dict['resnet18'] = models.resnet18(pretrained=True)
-        models_dict['resnet50'] = models.resnet50(pretrained=True)
-        models_dict['mobilenet_v2'] = models.mobilenet_v2(pretrained=True)
-
-        # Object detection
-        try:
-            models_dict['faster_rcnn'] = torchvision.models.detection.fasterrcnn_resnet50_fpn(
-                pretrained=True, progress=True)
-        except:
-            print("Faster R-CNN not available")
+        for name in PYTORCH_MODEL_BUILDERS:
+            try:
+                models_dict[name] = self.get(name)
+            except Exception:
+                print(f"{name} not available")
 
         # Save models
-        for name, model in models_dict.items():
-            model_path = self.models_dir / f"{name}.pth"
-            torch.save(model.state_dict(), model_path)
-            print(f"Saved {name} to {model_path}")
+        for name in models_dict:
+            self.cache_to_disk(name)
 
         return models_dict
 
+    def cache_to_disk(self, name: str) -> Path:
+        """Save a model's state_dict under models_dir, unless it is already there"""
+        model_path = self.models_dir / f"{name}.pth"
+        if not model_path.exists():
+            torch.save(self.get(name).state_dict(), model_path)
+            print(f"Saved {name} to {model_path}")
+        return model_path
+
+    def get(self, name: str) -> torch.nn.Module:
+        """
+        Load a single pre-trained PyTorch model by name.
+
+        Each model is built on first request and cached on this instance, so
+        only one copy of its weights is held. Repeated calls return the same
+        module: callers that modify it (e.g. replace the classifier head) and
+        need the original again should use a new NVIDIAPretrained.
+        """
+        if name not in PYTORCH_MODEL_BUILDERS:
+            raise ValueError(f"Unknown model: {name}")
+        if name not in self._cache:
+            self._cache[name] = PYTORCH_MODEL_BUILDERS[name]()
+        return self._cache[name]
+
     def get_model_info(self, model_name: str) -> Dict:
         """Get information about a model"""
         model_info = {
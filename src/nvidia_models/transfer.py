@@ -4,7 +4,7 @@ Transfer learning with NVIDIA models
 import torch
 import torch.nn as nn
 from torch.utils.data import DataLoader
-from typing import Dict
+from typing import Dict, List
 import numpy as np
 
 class TransferLearning:
@@ -13,29 +13,58 @@ class TransferLearning:
     def __init__(self, base_model: nn.Module, num_classes: int):
         self.base_model = base_model
         self.num_classes = num_classes
+        self.head = None
 
     def create_model(self, freeze_backbone: bool = True) -> nn.Module:
         """Create transfer learning model"""
-        # Freeze backbone if specified
-        if freeze_backbone:
-            for param in self.base_model.parameters():
-                param.requires_grad = False
+        # Freeze (or unfreeze) the whole backbone in one call
+        self.base_model.requires_grad_(not freeze_backbone)
 
         # Modify last layer based on model type
         if hasattr(self.base_model, 'fc'):  # ResNet
             num_features = self.base_model.fc.in_features
-            self.base_model.fc = nn.Linear(num_features, self.num_classes)
+            self.head = nn.Linear(num_features, self.num_classes)
+            self.base_model.fc = self.head
 
         elif hasattr(self.base_model, 'classifier'):  # MobileNet/EfficientNet
             if isinstance(self.base_model.classifier, nn.Sequential):
                 num_features = self.base_model.classifier[-1].in_features
-                self.base_model.classifier[-1] = nn.Linear(num_features, self.num_classes)
+                self.head = nn.Linear(num_features, self.num_classes)
+                self.base_model.classifier[-1] = self.head
             else:
                 num_features = self.base_model.classifier.in_features
-                self.base_model.classifier = nn.Linear(num_features, self.num_classes)
+                self.head = nn.Linear(num_features, self.num_classes)
+                self.base_model.classifier = self.head
+
+        if self.head is not None:
+            self.head.requires_grad_(True)
 
         return self.base_model
 
+    def param_groups(self, head_lr: float, backbone_lr: float = 0.0) -> List[Dict]:
+        """
+        Optimizer parameter groups for discriminative fine-tuning
+
+        Args:
+            head_lr: Learning rate for the new classification head
+            backbone_lr: Learning rate for the backbone; 0 leaves it out of
+                the optimizer (create_model(freeze_backbone=False) is needed
+                for it to train)
+
+        Returns:
+            List of parameter group dicts for a torch.optim optimizer
+        """
+        if self.head is None:
+            raise RuntimeError("param_groups() needs create_model() to be called first")
+
+        head_params = list(self.head.parameters())
+        head_ids = {id(p) for p in head_params}
+        groups = [{'params': head_params, 'lr': head_lr}]
+        if backbone_lr > 0:
+            backbone_params = [p for p in self.base_model.parameters() if id(p) not in head_ids]
+            groups.append({'params': backbone_params, 'lr': backbone_lr})
+        return groups
+
     def save_model(self, model: nn.Module, path: str):
         """Save trained model"""
         torch.save({
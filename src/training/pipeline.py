@@ -1,14 +1,56 @@
 """
 Complete training pipeline for robotics
 """
+import contextlib
+
 import torch
+import torch.distributed as dist
 import torch.nn as nn
 from torch.utils.data import DataLoader
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import json
 
+class CUDAPrefetcher:
+    """
+    Wraps a DataLoader so the next batch is copied to the device on a side
+    stream while the current batch is computing. On CPU it just moves batches.
+    """
+
+    def __init__(self, loader: DataLoader, device: torch.device):
+        self.loader = loader
+        self.device = device
+
+    def __len__(self) -> int:
+        return len(self.loader)
+
+    def __iter__(self):
+        if self.device.type != 'cuda':
+            for batch in self.loader:
+                yield tuple(t.to(self.device) for t in batch)
+            return
+
+        stream = torch.cuda.Stream(device=self.device)
+        batches = iter(self.loader)
+        next_batch = self._preload(batches, stream)
+        while next_batch is not None:
+            torch.cuda.current_stream().wait_stream(stream)
+            batch = next_batch
+            # Keep the allocator from reusing these buffers while the compute stream reads them
+            for t in batch:
+                t.record_stream(torch.cuda.current_stream())
+            next_batch = self._preload(batches, stream)
+            yield batch
+
+    def _preload(self, batches, stream):
+        try:
+            batch = next(batches)
+        except StopIteration:
+            return None
+        with torch.cuda.stream(stream):
+            return tuple(t.to(self.device, non_blocking=True) for t in batch)
+
 class TrainingPipeline:
     """Complete training pipeline"""
 
@@ -16,21 +58,30 @@ class TrainingPipeline:
                  model: nn.Module,
                  train_loader: DataLoader,
                  val_loader: DataLoader,
-                 config: Dict):
+                 config: Dict,
+                 device: Optional[torch.device] = None,
+                 param_groups: Optional[List[Dict]] = None):
 
         self.model = model
         self.train_loader = train_loader
         self.val_loader = val_loader
         self.config = config
+        # Per-group learning rates (e.g. TransferLearning.param_groups); all parameters otherwise
+        self.param_groups = param_groups
 
-        # Setup device
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        # Setup device (DDP callers pass their local rank's device)
+        self.device = device or torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.model = self.model.to(self.device)
 
         # Setup optimizer and scheduler
         self.optimizer = self._create_optimizer()
         self.criterion = nn.CrossEntropyLoss()
 
+        # Mixed precision: bf16 autocast where supported, otherwise fp16 with loss scaling
+        self.use_amp = bool(config.get('mixed_precision', False)) and self.device.type == 'cuda'
+        self.amp_dtype = torch.bfloat16 if self.use_amp and torch.cuda.is_bf16_supported() else torch.float16
+        self.scaler = torch.cuda.amp.GradScaler(enabled=self.use_amp and self.amp_dtype == torch.float16)
+
         # Setup logging
         self.log_dir = Path(config.get('log_dir', 'logs')) / datetime.now().strftime('%Y%m%d_%H%M%S')
         self.log_dir.mkdir(parents=True, exist_ok=True)
@@ -39,59 +90,116 @@ class TrainingPipeline:
         self.best_accuracy = 0.0
         self.current_epoch = 0
 
+    @property
+    def unwrapped_model(self) -> nn.Module:
+        """Underlying model, without torch.compile or DistributedDataParallel wrappers"""
+        model = getattr(self.model, '_orig_mod', self.model)
+        return getattr(model, 'module', model)
+
+    @property
+    def is_main_process(self) -> bool:
+        """True on rank 0, or when not running distributed"""
+        return not dist.is_initialized() or dist.get_rank() == 0
+
+    def _print(self, *args, **kwargs):
+        """print on rank 0 only, so DDP runs log each epoch once"""
+        if self.is_main_process:
+            print(*args, **kwargs)
+
     def _create_optimizer(self):
         """Create optimizer"""
         optimizer_config = self.config.get('optimizer', {})
         lr = optimizer_config.get('learning_rate', 0.001)
+        params = self.param_groups or list(self.model.parameters())
 
-        return torch.optim.Adam(self.model.parameters(), lr=lr)
+        # Fused Adam updates every parameter in one CUDA kernel; foreach is the
+        # multi-tensor fallback on CPU or older PyTorch
+        if self.device.type == 'cuda':
+            try:
+                return torch.optim.Adam(params, lr=lr, fused=True)
+            except (TypeError, RuntimeError):
+                pass
+        return torch.optim.Adam(params, lr=lr, foreach=True)
 
     def train_epoch(self) -> Dict:
         """Train for one epoch"""
         self.model.train()
-        total_loss = 0.0
-        correct = 0
+        # Metrics accumulate on the device and are read back once per epoch,
+        # so the loop never blocks on a per-batch .item() sync
+        total_loss = torch.zeros((), device=self.device)
+        correct = torch.zeros((), dtype=torch.long, device=self.device)
         total = 0
 
-        for batch_idx, (data, target) in enumerate(self.train_loader):
-            data, target = data.to(self.device), target.to(self.device)
-
-            self.optimizer.zero_grad()
-            output = self.model(data)
-            loss = self.criterion(output, target)
-            loss.backward()
-            self.optimizer.step()
-
-            total_loss += loss.item()
+        accumulate = max(1, int(self.config.get('accumulate_grad_batches', 1)))
+        num_batches = len(self.train_loader)
+        # The loop never reads a value back per step, so bound the CUDA launch
+        # queue with an occasional sync instead (0 disables)
+        sync_interval = int(self.config.get('sync_interval', 32))
+        periodic_sync = self.device.type == 'cuda' and sync_interval > 0
+
+        self.optimizer.zero_grad(set_to_none=True)
+        for batch_idx, (data, target) in enumerate(CUDAPrefetcher(self.train_loader, self.device)):
+            boundary = (batch_idx + 1) % accumulate == 0 or batch_idx + 1 == num_batches
+
+            # Skip the DDP gradient all-reduce on micro-steps between optimizer updates
+            if boundary or not hasattr(self.model, 'no_sync'):
+                sync_context = contextlib.nullcontext()
+            else:
+                sync_context = self.model.no_sync()
+
+            with sync_context:
+                with torch.autocast(self.device.type, dtype=self.amp_dtype, enabled=self.use_amp):
+                    output = self.model(data)
+                    loss = self.criterion(output, target)
+                self.scaler.scale(loss / accumulate).backward()
+
+            if boundary:
+                self.scaler.step(self.optimizer)
+                self.scaler.update()
+                self.optimizer.zero_grad(set_to_none=True)
+
+            total_loss += loss.detach().float()
             pred = output.argmax(dim=1, keepdim=True)
-            correct += pred.eq(target.view_as(pred)).sum().item()
+            correct += pred.eq(target.view_as(pred)).sum()
             total += target.size(0)
 
-        avg_loss = total_loss / len(self.train_loader)
-        accuracy = 100. * correct / total
+            if periodic_sync and batch_idx % sync_interval == sync_interval - 1:
+                torch.cuda.synchronize(self.device)
 
-        return {'loss': avg_loss, 'accuracy': accuracy}
+        return self._reduce_metrics(total_loss, correct, total, len(self.train_loader))
 
     def validate(self) -> Dict:
         """Validate model"""
         self.model.eval()
-        total_loss = 0.0
-        correct = 0
+        total_loss = torch.zeros((), device=self.device)
+        correct = torch.zeros((), dtype=torch.long, device=self.device)
         total = 0
 
-        with torch.no_grad():
-            for data, target in self.val_loader:
-                data, target = data.to(self.device), target.to(self.device)
-                output = self.model(data)
-                total_loss += self.criterion(output, target).item()
+        with torch.inference_mode():
+            for data, target in CUDAPrefetcher(self.val_loader, self.device):
+                with torch.autocast(self.device.type, dtype=self.amp_dtype, enabled=self.use_amp):
+                    output = self.model(data)
+                    total_loss += self.criterion(output, target).float()
                 pred = output.argmax(dim=1, keepdim=True)
-                correct += pred.eq(target.view_as(pred)).sum().item()
+                correct += pred.eq(target.view_as(pred)).sum()
                 total += target.size(0)
 
-        avg_loss = total_loss / len(self.val_loader)
-        accuracy = 100. * correct / total
+        return self._reduce_metrics(total_loss, correct, total, len(self.val_loader))
+
+    def _reduce_metrics(self, total_loss: torch.Tensor, correct: torch.Tensor,
+                        total: int, num_batches: int) -> Dict:
+        """Epoch loss/accuracy from this rank's sums, combined across DDP ranks"""
+        sums = torch.stack([
+            total_loss.double(),
+            correct.double(),
+            torch.tensor(total, dtype=torch.float64, device=self.device),
+            torch.tensor(num_batches, dtype=torch.float64, device=self.device),
+        ])
+        if dist.is_initialized():
+            dist.all_reduce(sums)
+        loss_sum, correct_sum, total_sum, batch_sum = sums.tolist()
 
-        return {'loss': avg_loss, 'accuracy': accuracy}
+        return {'loss': loss_sum / batch_sum, 'accuracy': 100. * correct_sum / total_sum}
 
     def train(self, num_epochs: int = None):
         """Run complete training"""
@@ -103,14 +211,18 @@ class TrainingPipeline:
             'val_loss': [], 'val_accuracy': []
         }
 
-        print(f"Starting training for {num_epochs} epochs")
-        print(f"Device: {self.device}")
+        self._print(f"Starting training for {num_epochs} epochs")
+        self._print(f"Device: {self.device}")
 
         for epoch in range(self.current_epoch, num_epochs):
             self.current_epoch = epoch
 
-            print(f"\nEpoch {epoch+1}/{num_epochs}")
-            print("-" * 50)
+            # Reshuffle DistributedSampler shards each epoch
+            if hasattr(self.train_loader.sampler, 'set_epoch'):
+                self.train_loader.sampler.set_epoch(epoch)
+
+            self._print(f"\nEpoch {epoch+1}/{num_epochs}")
+            self._print("-" * 50)
 
             # Train
             train_metrics = self.train_epoch()
@@ -123,9 +235,9 @@ class TrainingPipeline:
             history['val_accuracy'].append(val_metrics['accuracy'])
 
             # Print progress
-            print(f"Train Loss: {train_metrics['loss']:.4f}, "
+            self._print(f"Train Loss: {train_metrics['loss']:.4f}, "
                   f"Train Acc: {train_metrics['accuracy']:.2f}%")
-            print(f"Val Loss: {val_metrics['loss']:.4f}, "
+            self._print(f"Val Loss: {val_metrics['loss']:.4f}, "
                   f"Val Acc: {val_metrics['accuracy']:.2f}%")
 
             # Save checkpoint if best
@@ -133,8 +245,8 @@ class TrainingPipeline:
                 self.best_accuracy = val_metrics['accuracy']
                 self.save_checkpoint('best')
 
-        print(f"\nTraining completed!")
-        print(f"Best validation accuracy: {self.best_accuracy:.2f}%")
+        self._print(f"\nTraining completed!")
+        self._print(f"Best validation accuracy: {self.best_accuracy:.2f}%")
 
         # Save final model
         self.save_checkpoint('final')
@@ -144,12 +256,17 @@ class TrainingPipeline:
 
     def save_checkpoint(self, name: str):
         """Save model checkpoint"""
+        if not self.is_main_process:
+            return
+
         checkpoint_path = self.log_dir / f'checkpoint_{name}.pth'
 
         checkpoint = {
             'epoch': self.current_epoch,
-            'model_state_dict': self.model.state_dict(),
+            'model_state_dict': self.unwrapped_model.state_dict(),
             'optimizer_state_dict': self.optimizer.state_dict(),
+            # Resuming FP16 runs without the loss scale restarts it at 2**16 and skips early steps
+            'scaler_state_dict': self.scaler.state_dict(),
             'best_accuracy': self.best_accuracy,
             'config': self.config
         }
@@ -159,6 +276,9 @@ class TrainingPipeline:
 
     def save_history(self, history: Dict):
         """Save training history"""
+        if not self.is_main_process:
+            return
+
         history_path = self.log_dir / 'training_history.json'
 
         with open(history_path, 'w') as f:
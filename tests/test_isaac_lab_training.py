@@ -0,0 +1,33 @@
+"""
+Regression tests for DigitalTwinTester joint-limit validation
+"""
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+MODULE_PATH = Path(__file__).resolve().parent.parent / "robotics-brain" / "training" / "isaac_lab_training.py"
+
+
+def _load_module():
+    spec = importlib.util.spec_from_file_location("isaac_lab_training", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_integer_first_command_does_not_truncate_later_targets():
+    tester = _load_module().DigitalTwinTester(policy=None, simulation_config={})
+    commands = [
+        {"joint_targets": [0, 0, 0, 0, 0, 0], "duration_ms": 10.0},
+        {"joint_targets": [0.0, 3.9, 0.0, -3.9, 0.0, 0.0], "duration_ms": 10.0},
+    ]
+
+    result = tester.test_command_sequence(commands, expected_duration_ms=20.0)
+
+    assert not result["safety_valid"]
+    assert not result["success"]
+    assert any("Joint 1 target 3.900" in e for e in result["errors"])
+    assert any("Joint 3 target -3.900" in e for e in result["errors"])